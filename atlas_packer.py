@@ -0,0 +1,82 @@
+import os
+import sys
+import pygame
+from src.atlas import write_manifest
+
+# Packs every sprite under assets/sprites into atlas pages plus a binary manifest.
+# Run from the repo root after adding or editing sprites:  python atlas_packer.py
+SPRITE_DIR = 'assets/sprites'
+OUTPUT_DIR = 'assets/atlas'
+MANIFEST_NAME = 'atlas.bin'
+PAGE_SIZE = 1024
+PADDING = 1  # Transparent gap between sprites so filtering never bleeds neighbours
+SPRITE_EXTENSIONS = ('.png',)
+
+
+def find_sprites(sprite_dir):
+    """ Returns sprite paths as stored in the DB (forward slashes, relative to the repo root). """
+    paths = []
+    for root, _, files in os.walk(sprite_dir):
+        for name in files:
+            if name.lower().endswith(SPRITE_EXTENSIONS):
+                paths.append(os.path.join(root, name).replace(os.sep, '/'))
+    return sorted(paths)
+
+
+def pack_shelves(sizes, page_size, padding):
+    """ Shelf-packs (w, h) sizes, tallest first, into as many pages as needed.
+
+    Returns a list of (page, x, y) placements in the same order as sizes.
+    """
+    order = sorted(range(len(sizes)), key=lambda i: (-sizes[i][1], -sizes[i][0]))
+    placements = [None] * len(sizes)
+    page = 0
+    x = y = shelf_height = 0
+    for i in order:
+        w, h = sizes[i]
+        if w + padding > page_size or h + padding > page_size:
+            raise ValueError(f"Sprite of size {w}x{h} does not fit on a {page_size}px page")
+        if x + w + padding > page_size:
+            x, y, shelf_height = 0, y + shelf_height, 0
+        if y + h + padding > page_size:
+            page, x, y, shelf_height = page + 1, 0, 0, 0
+        placements[i] = (page, x, y)
+        x += w + padding
+        shelf_height = max(shelf_height, h + padding)
+    return placements
+
+
+def build_atlas(sprite_dir=SPRITE_DIR, output_dir=OUTPUT_DIR, page_size=PAGE_SIZE, padding=PADDING):
+    paths = find_sprites(sprite_dir)
+    if not paths:
+        print(f"No sprites found in {sprite_dir}")
+        return
+    images = [pygame.image.load(path) for path in paths]
+    sizes = [image.get_size() for image in images]
+    placements = pack_shelves(sizes, page_size, padding)
+
+    # Trim each page to the area actually used
+    page_count = max(page for page, _, _ in placements) + 1
+    extents = [[0, 0] for _ in range(page_count)]
+    for (page, x, y), (w, h) in zip(placements, sizes):
+        extents[page][0] = max(extents[page][0], x + w)
+        extents[page][1] = max(extents[page][1], y + h)
+
+    os.makedirs(output_dir, exist_ok=True)
+    page_names = []
+    for page, (width, height) in enumerate(extents):
+        surface = pygame.Surface((width, height), pygame.SRCALPHA)
+        for image, (image_page, x, y) in zip(images, placements):
+            if image_page == page:
+                surface.blit(image, (x, y))
+        name = f"page_{page}.png"
+        pygame.image.save(surface, os.path.join(output_dir, name))
+        page_names.append(name)
+
+    entries = {path: (page, x, y, w, h) for path, (page, x, y), (w, h) in zip(paths, placements, sizes)}
+    write_manifest(os.path.join(output_dir, MANIFEST_NAME), page_names, entries)
+    print(f"Packed {len(entries)} sprites into {page_count} page(s) in {output_dir}")
+
+
+if __name__ == '__main__':
+    build_atlas(*sys.argv[1:2])
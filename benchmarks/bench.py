@@ -0,0 +1,230 @@
+import os
+import sys
+# Must be set before pygame initializes video
+os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+os.environ.setdefault('SDL_AUDIODRIVER', 'dummy')
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+import argparse
+import contextlib
+from collections import defaultdict
+import io
+import json
+import platform
+import random
+import statistics
+import subprocess
+import time
+import numpy as np
+import pygame
+import src.config as cfg
+from src import collision_utils
+from src.world import World
+from src.atlas import load_atlas
+from src.flight_paths import FlightPathTable
+from src.components import (Position, Velocity, Sprite, Rotation, Acceleration, Hitbox, Health, FlightPlan,
+                            LevelManager, IsActive, IsVisible, AtlasReference, CollisionLayer)
+from src.systems import (InputSystem, MovementSystem, CullingSystem, FlightSystem, RotationSystem,
+                         HitboxUpdateSystem, CollisionSystem, BoundarySystem, CleanupSystem, LevelSystem,
+                         RenderSystem, DamageSystem)
+
+# Times the collision_utils primitives and every system's process() over a range
+# of entity counts and writes the results as JSON, e.g.
+#   python benchmarks/bench.py --counts 100 1000 5000 --output before.json
+#   python benchmarks/compare.py before.json after.json
+DEFAULT_COUNTS = (100, 1000, 5000)
+DEFAULT_REPEATS = 30
+FUNCTION_CALLS = 2000  # Calls per timed sample for the collision_utils primitives
+MOB_HITBOX = 'assets/hitboxes/mob_01_v1.json'
+BULLET_HITBOX = 'assets/hitboxes/basic_bullet_v1.json'
+
+
+def _time_samples(fn, repeats):
+    samples = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - start)
+    return samples
+
+
+def _result(group, name, count, samples, per=1):
+    samples = [s / per for s in samples]
+    return {
+        'group': group,
+        'name': name,
+        'count': count,
+        'median_ms': statistics.median(samples) * 1000.0,
+        'min_ms': min(samples) * 1000.0,
+        'repeats': len(samples),
+    }
+
+
+def bench_functions(repeats, rng):
+    """ Times each collision_utils primitive on FUNCTION_CALLS random inputs. """
+    def square(x, y):
+        return collision_utils.get_square_vertices(x, y, rng.uniform(5, 30), rng.uniform(5, 30), rng.uniform(0, 360))
+
+    inputs = [(rng.uniform(0, 60), rng.uniform(0, 60), rng.uniform(0, 60), rng.uniform(0, 60))
+              for _ in range(FUNCTION_CALLS)]
+    squares = [(square(x1, y1), square(x2, y2)) for x1, y1, x2, y2 in inputs]
+    radii = [(rng.uniform(2, 20), rng.uniform(2, 20)) for _ in range(FUNCTION_CALLS)]
+
+    def circle_circle():
+        check = collision_utils.check_circle_circle_collision
+        for (x1, y1, x2, y2), (r1, r2) in zip(inputs, radii):
+            check(x1, y1, r1, x2, y2, r2)
+
+    def square_square():
+        check = collision_utils.check_square_square_collision
+        for v1, v2 in squares:
+            check(v1, v2)
+
+    def circle_square():
+        check = collision_utils.check_circle_square_collision
+        for (x1, y1, _, _), (r1, _), (_, v2) in zip(inputs, radii, squares):
+            check(x1, y1, r1, v2)
+
+    def square_vertices():
+        vertices = collision_utils.get_square_vertices
+        for x1, y1, x2, y2 in inputs:
+            vertices(x1, y1, x2 * 0.5, y2 * 0.5, x1 * 6.0)
+
+    results = []
+    for name, fn in (('check_circle_circle_collision', circle_circle),
+                     ('check_square_square_collision', square_square),
+                     ('check_circle_square_collision', circle_square),
+                     ('get_square_vertices', square_vertices)):
+        fn()  # Warm up
+        results.append(_result('collision_utils', name, 1, _time_samples(fn, repeats), FUNCTION_CALLS))
+    return results
+
+
+def build_world(count, rng, screen):
+    """ A player plus `count` entities: a quarter rotating mobs on flight plans, the rest bullets. """
+    world = World(columnar=cfg.COLUMNAR_STORAGE)
+    world.atlas = load_atlas(cfg.ATLAS_MANIFEST_PATH)
+    world.assets.atlas = world.atlas
+    mob_hitbox = world.assets.hitbox(MOB_HITBOX)
+    bullet_hitbox = world.assets.hitbox(BULLET_HITBOX)
+    # Looping curved plans around the screen, so mobs stay in flight for the whole run
+    world.flight_plans = {}
+    for plan_id in range(8):
+        world.flight_plans[plan_id] = [{'X': rng.uniform(0, cfg.SCREEN_WIDTH), 'Y': rng.uniform(0, cfg.SCREEN_HEIGHT),
+                                        'Waypoint_Time_Offset': 0.0, 'Speed': rng.uniform(50, 200), 'Action': 'move'}
+                                       for _ in range(5)]
+    world.flight_paths = FlightPathTable.from_level(
+        world.flight_plans, {plan_id: {'Path_Type': 'curved', 'Loop_Count': -1} for plan_id in world.flight_plans})
+
+    player = world.add_entity()
+    world.add_component(player, Position(cfg.SCREEN_WIDTH / 2, cfg.SCREEN_HEIGHT / 2))
+    world.add_component(player, Velocity(max_speed=cfg.PLAYER_MAX_SPEED))
+    world.add_component(player, Acceleration())
+    world.add_component(player, Sprite(world.assets.sprite(cfg.DEFAULT_MOB_SPRITE)))
+
+    for i in range(count):
+        eid = world.add_entity()
+        x, y = rng.uniform(0, cfg.SCREEN_WIDTH), rng.uniform(0, cfg.SCREEN_HEIGHT)
+        world.add_component(eid, Position(x, y))
+        world.add_component(eid, Velocity(rng.uniform(-60, 60), rng.uniform(-60, 60)))
+        world.add_component(eid, IsActive(True))
+        world.add_component(eid, IsVisible(True))
+        if i % 4 == 0:
+            world.add_component(eid, AtlasReference(cfg.DEFAULT_MOB_SPRITE))
+            world.add_component(eid, Rotation(rng.uniform(0, 360), rng.uniform(-90, 90)))
+            world.add_component(eid, Health(10 ** 9))
+            world.add_component(eid, Hitbox(mob_hitbox.local_shapes, mob_hitbox))
+            world.add_component(eid, CollisionLayer(cfg.COLLISION_LAYER_MOB, cfg.COLLISION_LAYER_PLAYER_BULLET))
+            plan_id = (i // 4) % len(world.flight_plans)
+            world.add_component(eid, FlightPlan(plan_id, world.flight_plans[plan_id], 0, -rng.uniform(0, 10)))
+        else:
+            world.add_component(eid, AtlasReference(cfg.DEFAULT_BULLET_SPRITE))
+            world.add_component(eid, Hitbox(bullet_hitbox.local_shapes, bullet_hitbox))
+            world.add_component(eid, CollisionLayer(cfg.COLLISION_LAYER_PLAYER_BULLET, cfg.COLLISION_LAYER_MOB))
+
+    DamageSystem(world)
+    level = world.add_entity()
+    world.add_component(level, LevelManager(1, [], {}))
+
+    systems = [
+        InputSystem(world, player, key_source=lambda: defaultdict(bool)),  # No keys held
+        MovementSystem(world),
+        CullingSystem(world),
+        FlightSystem(world),
+        RotationSystem(world),
+        HitboxUpdateSystem(world),
+        CollisionSystem(world),
+        BoundarySystem(world),
+        CleanupSystem(world),
+        LevelSystem(world),
+        RenderSystem(world, screen),
+    ]
+    return world, systems
+
+
+def bench_systems(count, repeats, rng, screen, dt):
+    """ Runs the full pipeline repeatedly and times each system's process() per frame. """
+    world, systems = build_world(count, rng, screen)
+    samples = {type(system).__name__: [] for system in systems}
+    for frame in range(repeats + 1):
+        world.time += dt
+        for system in systems:
+            start = time.perf_counter()
+            system.process(dt)
+            elapsed = time.perf_counter() - start
+            if frame:  # The first frame builds caches and buffers; don't count it
+                samples[type(system).__name__].append(elapsed)
+        world.events.dispatch()
+        world.commands.flush()
+    return [_result('systems', name, count, times) for name, times in samples.items()]
+
+
+def _git_revision():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True,
+                              check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark collision_utils and every system.')
+    parser.add_argument('--counts', type=int, nargs='+', default=list(DEFAULT_COUNTS), help='Entity counts')
+    parser.add_argument('--repeats', type=int, default=DEFAULT_REPEATS, help='Timed samples per benchmark')
+    parser.add_argument('--seed', type=int, default=1)
+    parser.add_argument('--output', default=os.path.join(ROOT, 'benchmarks', 'results', 'latest.json'), help='JSON results path')
+    args = parser.parse_args()
+    output = os.path.abspath(args.output)
+    os.chdir(ROOT)  # Asset paths are relative to the repo root
+
+    pygame.init()
+    screen = pygame.display.set_mode((cfg.SCREEN_WIDTH, cfg.SCREEN_HEIGHT))
+    rng = random.Random(args.seed)
+    dt = 1.0 / cfg.SIM_TICK_RATE
+    # Systems still print diagnostics; keep them out of the timing output
+    with contextlib.redirect_stdout(io.StringIO()):
+        results = bench_functions(args.repeats, rng)
+        for count in args.counts:
+            results.extend(bench_systems(count, args.repeats, rng, screen, dt))
+    pygame.quit()
+
+    report = {
+        'revision': _git_revision(),
+        'created': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'python': platform.python_version(),
+        'numpy': np.__version__,
+        'pygame': pygame.version.ver,
+        'seed': args.seed,
+        'results': results,
+    }
+    os.makedirs(os.path.dirname(output), exist_ok=True)
+    with open(output, 'w') as f:
+        json.dump(report, f, indent=2)
+    for r in results:
+        print(f"{r['group']:16} {r['name']:32} {r['count']:>6}  {r['median_ms']:10.4f} ms")
+    print(f"Wrote {len(results)} results to {output}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,29 @@
+import json
+import sys
+
+# Compares two bench.py result files:  python benchmarks/compare.py old.json new.json
+# A ratio below 1.0 means the new run is faster.
+
+
+def _load(path):
+    with open(path, 'r') as f:
+        report = json.load(f)
+    return report, {(r['group'], r['name'], r['count']): r for r in report['results']}
+
+
+def main(old_path, new_path):
+    old_report, old = _load(old_path)
+    new_report, new = _load(new_path)
+    print(f"{old_report.get('revision')} -> {new_report.get('revision')}")
+    for key in sorted(old.keys() & new.keys()):
+        before, after = old[key]['median_ms'], new[key]['median_ms']
+        ratio = after / before if before else float('inf')
+        print(f"{key[0]:16} {key[1]:32} {key[2]:>6}  {before:10.4f} -> {after:10.4f} ms  x{ratio:.2f}")
+    for key in sorted(old.keys() ^ new.keys()):
+        print(f"{key[0]:16} {key[1]:32} {key[2]:>6}  only in {'old' if key in old else 'new'}")
+
+
+if __name__ == '__main__':
+    if len(sys.argv) != 3:
+        sys.exit('usage: compare.py OLD.json NEW.json')
+    main(sys.argv[1], sys.argv[2])
@@ -0,0 +1,91 @@
+import os
+# Must be set before pygame initializes video
+os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+os.environ.setdefault('SDL_AUDIODRIVER', 'dummy')
+
+import argparse
+import json
+import time
+import pygame
+import src.config as cfg
+from main import build_world
+
+# Runs the game without a window, stepping a fixed dt as fast as the CPU allows.
+# Input comes from a JSON script: a list of {"start": s, "end": s, "keys": [names]}
+# entries, where names are pygame key names such as "space", "a" or "left".
+#   python headless.py --seconds 120 --script soak.json
+
+
+class ScriptedKeys:
+    """ Key state for InputSystem driven by a timeline instead of the keyboard. """
+
+    def __init__(self, world, script=()):
+        self.world = world
+        self.script = [(entry['start'], entry['end'], [pygame.key.key_code(name) for name in entry['keys']])
+                       for entry in script]
+        self.held = set()
+
+    def __call__(self):
+        now = self.world.time
+        self.held.clear()
+        for start, end, keys in self.script:
+            if start <= now < end:
+                self.held.update(keys)
+        return self
+
+    def __getitem__(self, key):
+        return key in self.held
+
+
+def run_headless(seconds, dt=1.0 / cfg.SIM_TICK_RATE, script=(), trace_path=None):
+    """ Simulates `seconds` of game time and returns a summary dict.
+
+    With trace_path, every frame is traced and the ring buffer is exported there at the end.
+    """
+    pygame.init()
+    keys = ScriptedKeys(None, script)
+    world = build_world(key_source=keys)
+    keys.world = world
+    if trace_path:
+        world.tracer.enabled = True
+    frames = int(round(seconds / dt))
+    start = time.perf_counter()
+    for _ in range(frames):
+        pygame.event.pump()
+        world.update(dt)
+    wall = time.perf_counter() - start
+    world.tracer.write_spikes()
+    if trace_path:
+        world.tracer.export(trace_path)
+    pygame.quit()
+    return {
+        'frames': frames,
+        'sim_seconds': world.time,
+        'wall_seconds': wall,
+        'speedup': world.time / wall if wall else float('inf'),
+        'live_entities': len(world.live_entities),
+        'pools': world.pool_manager.report(),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Run Space Vault without a display.')
+    parser.add_argument('--seconds', type=float, default=60.0, help='Game time to simulate')
+    parser.add_argument('--dt', type=float, default=1.0 / cfg.SIM_TICK_RATE, help='Fixed timestep in seconds')
+    parser.add_argument('--script', help='JSON input script')
+    parser.add_argument('--trace', help='Write a Chrome trace of the run to this path')
+    args = parser.parse_args()
+    script = []
+    if args.script:
+        with open(args.script, 'r') as f:
+            script = json.load(f)
+    summary = run_headless(args.seconds, args.dt, script, args.trace)
+    print(f"Simulated {summary['sim_seconds']:.1f}s in {summary['frames']} frames, "
+          f"{summary['wall_seconds']:.2f}s wall time ({summary['speedup']:.0f}x real time), "
+          f"{summary['live_entities']} live entities")
+    for pool_type, stats in summary['pools'].items():
+        print(f"Pool {pool_type}: {stats}")
+
+
+if __name__ == '__main__':
+    main()
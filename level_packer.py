@@ -0,0 +1,49 @@
+import os
+import sys
+import src.config as cfg
+from src.gamedb import GameDB
+from src.hitbox_loader import load_hitbox_from_json
+from src.levelpack import write_pack, source_digest
+
+# Compiles one level from GameDB.db (events, flight plans, formations, plus every ship,
+# weapon and mob definition and the hitboxes they use) into a binary level pack.
+# The pack is stamped with a digest of those sources; the game ignores a pack that no
+# longer matches GameDB.db or the hitbox files.
+# Run from the repo root after editing the DB or hitboxes:  python level_packer.py [level]
+
+
+def build_level_pack(level=1, db_path=cfg.GAME_DB_PATH, output=None):
+    output = output or cfg.LEVEL_PACK_PATH.format(level=level)
+    db = GameDB(db_path)
+    definitions = db.load_definitions()
+    level_data = db.load_level(level)
+
+    # The save (Player) isn't packed: the game resolves its current ship and weapon at startup
+    hitbox_paths = [ship['Ship_Hitbox_Path'] for ship in definitions['ships']]
+    hitbox_paths += [weapon['Projectile_Hitbox_Path'] for weapon in definitions['weapons']]
+    hitbox_paths.append(cfg.MOB_HITBOX_PATH)
+    hitbox_shapes = []
+    for path in dict.fromkeys(p for p in hitbox_paths if p):
+        for shape in load_hitbox_from_json(path):
+            hitbox_shapes.append({'hitbox': path, **shape})
+    digest = source_digest(db, {shape['hitbox'] for shape in hitbox_shapes})
+    db.close()
+
+    tables = {
+        'ships': definitions['ships'],
+        'weapons': definitions['weapons'],
+        'placements': definitions['placements'],
+        'mobs': definitions['mobs'],
+        'events': level_data['events'],
+        'waypoints': [wp for plan in level_data['flight_plans'].values() for wp in plan],
+        'flight_plans': list(level_data['flight_plan_info'].values()),
+        'formations': [member for members in level_data['formations'].values() for member in members],
+        'hitbox_shapes': hitbox_shapes,
+    }
+    os.makedirs(os.path.dirname(output) or '.', exist_ok=True)
+    write_pack(output, level, tables, digest)
+    print(f"Packed level {level} ({len(tables['events'])} events, {len(hitbox_shapes)} hitbox shapes) into {output}")
+
+
+if __name__ == '__main__':
+    build_level_pack(int(sys.argv[1]) if len(sys.argv) > 1 else 1)
@@ -1,171 +1,78 @@
+import os
 import pygame
 import sys
 from src.world import World
-from src.components import Position, Velocity, Sprite, Rotation, Acceleration, Hitbox, PlayerWeapon, Health, Damage, FlightPlan, LevelManager, Projectile, IsActive, IsVisible, AtlasReference
+from src.atlas import load_atlas
+from src.tracing import Tracer
+from src.events import EventLogger
+from src.components import Position, Velocity, Sprite, Rotation, Acceleration, Hitbox, PlayerWeapon, Health, Damage, FlightPlan, FormationMember, LevelManager, Projectile, IsActive, IsVisible, AtlasReference, CollisionLayer
 from src.systems import (
     InputSystem, MovementSystem, RenderSystem, RotationSystem, BoundarySystem, 
-    HitboxUpdateSystem, CollisionSystem, CleanupSystem, FlightSystem, LevelSystem, CullingSystem
+    HitboxUpdateSystem, CollisionSystem, CleanupSystem, FlightSystem, LevelSystem, CullingSystem,
+    DamageSystem
 )
-from src.hitbox_loader import load_hitbox_from_json
 # Import config module with alias
 import src.config as cfg 
-import sqlite3
-import json
+from src.gamedb import GameDB
+from src.levelpack import LevelPack, source_digest
+from src.flight_paths import FlightPathTable
 
-def load_player_data(player_id=1):
-    try:
-        conn = sqlite3.connect('GameDB.db')
-        conn.row_factory = sqlite3.Row
-        cursor = conn.cursor()
-        cursor.execute('SELECT * FROM Player WHERE Player_ID = ?', (player_id,))
-        player_row = cursor.fetchone()
-        if not player_row:
-            # Insert default player (existing)
-            cursor.execute('''
-                INSERT INTO Player (Create_Date, Current_Ship_ID, Current_Weapon_ID, Current_Level_ID, Items, Score, Lives, Last_Save_Date)
-                VALUES (strftime("%s","now"), 1, 1, 1, "{}", 0, 3, strftime("%s","now"));
-            ''')
-            conn.commit()
-            player_id = cursor.lastrowid
-            cursor.execute('SELECT * FROM Player WHERE Player_ID = ?', (player_id,))
-            player_row = cursor.fetchone()
-        
-        ship_id = player_row['Current_Ship_ID']
-        cursor.execute('SELECT * FROM Ships WHERE Ship_ID = ?', (ship_id,))
-        ship_data = cursor.fetchone()
-        if not ship_data:
-            # Insert default ship (existing)
-            cursor.execute('''
-                INSERT INTO Ships (Ship_Level, Ship_Mod, Ship_HP, Ship_Sprite_Path, Ship_Hitbox_Path)
-                VALUES (1, "v1", 100, "assets/sprites/Sprite-0001.png", "assets/hitboxes/main_ship_v1.json");
-            ''')
-            conn.commit()
-            ship_id = cursor.lastrowid
-            cursor.execute('UPDATE Player SET Current_Ship_ID = ? WHERE Player_ID = ?', (ship_id, player_id))
-            conn.commit()
-            cursor.execute('SELECT * FROM Ships WHERE Ship_ID = ?', (ship_id,))
-            ship_data = cursor.fetchone()
-        
-        weapon_id = player_row['Current_Weapon_ID']
-        cursor.execute('SELECT * FROM Weapons WHERE Weapon_ID = ?', (weapon_id,))
-        weapon_row = cursor.fetchone()
-        if weapon_row:
-            print(f"Loaded weapon {weapon_id} from DB")
-            projectile_id = weapon_row['Projectile_ID']
-            cursor.execute('SELECT Projectile_Sprite_Path, Projectile_Hitbox_Path, Projectile_Base_Speed, Projectile_Damage FROM Projectiles WHERE Projectile_ID = ?', (projectile_id,))
-            proj_data = cursor.fetchone()
-            if proj_data:
-                print(f"Loaded projectile {projectile_id}: sprite={proj_data['Projectile_Sprite_Path']}, hitbox={proj_data['Projectile_Hitbox_Path']}, speed={proj_data['Projectile_Base_Speed']}")
-                cursor.execute('SELECT Placements_JSON FROM WeaponPlacements WHERE Weapon_ID = ? AND Sprite_Path = ?', (weapon_id, ship_data['Ship_Sprite_Path']))
-                placement_row = cursor.fetchone()
-                placements = []
-                if placement_row and placement_row['Placements_JSON']:
-                    import json
-                    data = json.loads(placement_row['Placements_JSON'])
-                    placements = [(d['local_x'], d['local_y']) for d in data]
-                    print(f"Loaded {len(placements)} placements for weapon {weapon_id} on sprite {ship_data['Ship_Sprite_Path']}")
-                db_data = {'ship_data': ship_data, 'weapon_data': {'placements': placements, 'bullet_sprite_path': proj_data['Projectile_Sprite_Path'], 'bullet_hitbox_path': proj_data['Projectile_Hitbox_Path'], 'speed': proj_data['Projectile_Base_Speed'] or 300, 'damage': proj_data['Projectile_Damage'] or 10}}
-            else:
-                print(f"No projectile data for ID {projectile_id}")
-                db_data = {'ship_data': ship_data, 'weapon_data': {}}
+def load_game_data(level, db=None):
+    """ Returns (player data, level data, packed hitboxes, db) for a level.
+
+    The save (current ship, weapon, ...) always comes from GameDB.db, which is
+    returned open. Definitions come from the compiled level pack (see
+    level_packer.py) when its digest still matches the DB and hitbox files;
+    otherwise, or when a db is passed in, everything is loaded from the DB.
+    """
+    pack_path = cfg.LEVEL_PACK_PATH.format(level=level)
+    use_pack = db is None and cfg.USE_LEVEL_PACK and os.path.exists(pack_path)
+    db = db or GameDB(cfg.GAME_DB_PATH)
+    if use_pack:
+        try:
+            pack = LevelPack(pack_path)
+        except ValueError as e:
+            print(f"{e}; loading from {cfg.GAME_DB_PATH}")
         else:
-            print(f"No weapon data for ID {weapon_id}")
-            db_data = {'ship_data': ship_data, 'weapon_data': {}}
-        # mobs
-        # Load mob data
-        cursor.execute('SELECT * FROM Mobs LIMIT 1')  # Get first mob for now
-        mob_data = cursor.fetchone()
-        if not mob_data:
-            # Insert default mob if missing
-            cursor.execute("INSERT INTO Mobs (Mob_Name, Mob_Level, Mob_HP, Mob_Sprite_Path) VALUES ('Basic Enemy', 1, 30, 'assets/sprites/mob_0001.png')")
-            conn.commit()
-            mob_id = cursor.lastrowid
-            cursor.execute('SELECT * FROM Mobs WHERE Mob_ID = ?', (mob_id,))
-            mob_data = cursor.fetchone()
-        
-        db_data['mob_data'] = mob_data
-        conn.close()
-        return db_data
-    except Exception as e:
-        print(f"DB error: {e}. Falling back to defaults.")
-        return {'ship_data': {'Ship_Sprite_Path': 'assets/sprites/Sprite-0001.png', 'Ship_Hitbox_Path': 'assets/hitboxes/main_ship_v1.json', 'Ship_HP': 100}, 'weapon_data': {'placements': [], 'bullet_sprite_path': 'assets/sprites/basic_bullet_0001.png', 'bullet_hitbox_path': 'assets/hitboxes/basic_bullet_v1.json', 'speed': 300, 'damage': 10}, 'mob_data': {'Mob_HP': 30, 'Mob_Sprite_Path': 'assets/sprites/mob_0001.png'}}
+            hitboxes = pack.hitboxes()
+            player_data = None
+            if pack.source_digest == source_digest(db, hitboxes):
+                player_data = pack.player_data(db.load_save())
+            if player_data is not None:
+                return player_data, pack.level_data(), hitboxes, db
+            print(f"{pack_path} is out of date with {cfg.GAME_DB_PATH}; loading from the DB "
+                  f"(rebuild it with level_packer.py)")
+    return db.load_player(), db.load_level(level), {}, db
 
-def save_player_data(player_id=1, updates=None):
-    try:
-        conn = sqlite3.connect('GameDB.db')
-        cursor = conn.cursor()
-        if updates:
-            set_clause = ', '.join(f"{k} = ?" for k in updates)
-            values = list(updates.values()) + [player_id]
-            cursor.execute(f'UPDATE Player SET {set_clause}, Last_Save_Date = strftime("%s","now") WHERE Player_ID = ?', values)
-        conn.commit()
-        conn.close()
-    except Exception as e:
-        print(f"Save error: {e}")
+def build_world(screen=None, key_source=None, db=None):
+    """ Builds the World with its pools, the player, level 1 and every system.
 
-def load_level_data(level=1):
-    try:
-        conn = sqlite3.connect('GameDB.db')
-        conn.row_factory = sqlite3.Row
-        cursor = conn.cursor()
-        
-        # Load level events using the new Level column
-        cursor.execute('SELECT * FROM Levels WHERE Level = ? ORDER BY Event_Start', (level,))
-        events = cursor.fetchall()
-        
-        # Load flight plans used in this level
-        flight_plans = {}
-        for event in events:
-            if event['Flight_Plan_ID']:
-                plan_id = event['Flight_Plan_ID']
-                if plan_id not in flight_plans:
-                    cursor.execute('SELECT * FROM Waypoints WHERE Flight_Plan_ID = ? ORDER BY Waypoint_Step', (plan_id,))
-                    waypoints = cursor.fetchall()
-                    flight_plans[plan_id] = [dict(wp) for wp in waypoints]
-        
-        # Cache mob data for all unique Mob_IDs in events
-        mob_ids = set(event['Mob_ID'] for event in events if event['Mob_ID'])
-        mob_cache = {}
-        for mob_id in mob_ids:
-            cursor.execute('SELECT * FROM Mobs WHERE Mob_ID = ?', (mob_id,))
-            mob_data = cursor.fetchone()
-            if mob_data:
-                mob_cache[mob_id] = dict(mob_data)
-        
-        conn.close()
-        return {'events': [dict(e) for e in events], 'flight_plans': flight_plans, 'mob_cache': mob_cache}
-    except Exception as e:
-        print(f"Error loading level data: {e}")
-        return {'events': [], 'flight_plans': {}, 'mob_cache': {}}
-
-def main():
-    # Initialize pygame
-    pygame.init()
-    screen = pygame.display.set_mode((cfg.SCREEN_WIDTH, cfg.SCREEN_HEIGHT))
-    # Use config alias for window caption
-    pygame.display.set_caption(cfg.WINDOW_CAPTION)
-    clock = pygame.time.Clock()
-    
-    # Initialize atlas
-    atlas_surface = pygame.image.load('assets/atlas.png')  # Assume a single atlas PNG
-    with open(cfg.ATLAS_JSON_PATH, 'r') as f:
-        atlas_data = json.load(f)
-    atlas = {}
-    for key, data in atlas_data.items():
-        rect = data['rect']
-        atlas[key] = atlas_surface.subsurface(rect)
+    Without a screen no RenderSystem is added, so the World can be stepped
+    headless. key_source overrides the keyboard for InputSystem. Game data comes
+    from load_game_data; the GameDB (on cfg.GAME_DB_PATH unless db is given) is
+    frozen before returning so nothing queries it during frames, and kept as world.db.
+    Returns the World.
+    """
+    db_data, level_data, packed_hitboxes, db = load_game_data(1, db)
+    # Initialize atlas (built by atlas_packer.py; keys are the DB sprite paths)
+    atlas = load_atlas(cfg.ATLAS_MANIFEST_PATH)
     
     # Create world
-    world = World()
+    tracer = Tracer(cfg.TRACE_ENABLED, cfg.TRACE_BUFFER_SPANS, cfg.TRACE_SPIKE_MS, cfg.TRACE_OUTPUT_DIR)
+    world = World(columnar=cfg.COLUMNAR_STORAGE, tracer=tracer)
     world.atlas = atlas  # Store in world for access
+    world.assets.atlas = atlas  # Sprite lookups resolve to atlas subsurfaces
+    for path, shapes in packed_hitboxes.items():
+        world.assets.add_hitbox(path, shapes)  # No hitbox JSON parsing when loading from a pack
     
     # Register bullet pool
     def create_bullet(eid):
         world.add_component(eid, Position(0, -100))  # Off-screen
         world.add_component(eid, Velocity(0, 0))
-        world.add_component(eid, AtlasReference('bullet'))
+        world.add_component(eid, AtlasReference(cfg.DEFAULT_BULLET_SPRITE))
         world.add_component(eid, Projectile())
         world.add_component(eid, Damage(10))  # Default
+        world.add_component(eid, CollisionLayer(cfg.COLLISION_LAYER_PLAYER_BULLET, cfg.COLLISION_LAYER_MOB))
         world.add_component(eid, IsActive(False))
         world.add_component(eid, IsVisible(False))
     
@@ -179,18 +86,21 @@ def main():
             vel.dx = 0
             vel.dy = 0
     
-    world.pool_manager.register_pool('bullet', 500, create_bullet, reset_bullet)
-    print("Registered bullet pool with 500 entities")
+    world.pool_manager.register_pool('bullet', cfg.BULLET_POOL_SIZE, create_bullet, reset_bullet,
+                                     grow_by=cfg.BULLET_POOL_GROW)
+    print(f"Registered bullet pool with {cfg.BULLET_POOL_SIZE} entities")
     
     # Register mob pool
     def create_mob(eid):
         world.add_component(eid, Position(0, -100))
         world.add_component(eid, Velocity(0, 0))
-        world.add_component(eid, AtlasReference('mob'))
+        world.add_component(eid, AtlasReference(cfg.DEFAULT_MOB_SPRITE))
         world.add_component(eid, Health(30))  # Default
-        mob_hitbox_data = load_hitbox_from_json('assets/hitboxes/mob_01_v1.json')
-        if mob_hitbox_data:
-            world.add_component(eid, Hitbox(mob_hitbox_data))
+        mob_hitbox = world.assets.hitbox(cfg.MOB_HITBOX_PATH)  # Parsed once, shared by the pool
+        if mob_hitbox.count:
+            world.add_component(eid, Hitbox(mob_hitbox.local_shapes, mob_hitbox))
+        world.add_component(eid, CollisionLayer(cfg.COLLISION_LAYER_MOB,
+                                                cfg.COLLISION_LAYER_PLAYER | cfg.COLLISION_LAYER_PLAYER_BULLET))
         world.add_component(eid, IsActive(False))
         world.add_component(eid, IsVisible(False))
     
@@ -203,21 +113,21 @@ def main():
         if vel:
             vel.dx = 0
             vel.dy = 0
-        # Remove FlightPlan and Health if present
-        if world.get(eid, FlightPlan):
-            world.components[FlightPlan].pop(eid, None)
-        if world.get(eid, Health):
-            world.components[Health].pop(eid, None)
+        # Remove FlightPlan, FormationMember and Health if present
+        world.remove_component(eid, FlightPlan)
+        world.remove_component(eid, FormationMember)
+        world.remove_component(eid, Health)
     
-    world.pool_manager.register_pool('mob', 50, create_mob, reset_mob)
-    print("Registered mob pool with 50 entities")
+    world.pool_manager.register_pool('mob', cfg.MOB_POOL_SIZE, create_mob, reset_mob,
+                                     grow_by=cfg.MOB_POOL_GROW)
+    print(f"Registered mob pool with {cfg.MOB_POOL_SIZE} entities")
     
-    db_data = load_player_data()
     ship_data = db_data['ship_data']
     
     # Create player entity
     player_eid = world.add_entity()
-    player_surface = pygame.image.load(ship_data['Ship_Sprite_Path'])
+    player_sprite_path = ship_data['Ship_Sprite_Path']
+    player_surface = world.assets.sprite(player_sprite_path)
     
     # Use config alias for initial player position (centered)
     player_initial_x = cfg.SCREEN_WIDTH // 2
@@ -226,21 +136,28 @@ def main():
     # Initialize Velocity with max_speed from config
     world.add_component(player_eid, Velocity(max_speed=cfg.PLAYER_MAX_SPEED))
     world.add_component(player_eid, Sprite(player_surface))
+    if player_sprite_path in world.atlas:
+        world.add_component(player_eid, AtlasReference(player_sprite_path))
     # Add Acceleration component to the player
     world.add_component(player_eid, Acceleration())
     
     # Load player hitbox
     player_hitbox_path = ship_data['Ship_Hitbox_Path']
-    player_hitbox_data = load_hitbox_from_json(player_hitbox_path)
-    if player_hitbox_data:
-        world.add_component(player_eid, Hitbox(player_hitbox_data))
+    player_hitbox = world.assets.hitbox(player_hitbox_path)
+    if player_hitbox.count:
+        world.add_component(player_eid, Hitbox(player_hitbox.local_shapes, player_hitbox))
     else:
         print('Warning: Player hitbox not loaded')
+    world.add_component(player_eid, CollisionLayer(cfg.COLLISION_LAYER_PLAYER,
+                                                   cfg.COLLISION_LAYER_MOB | cfg.COLLISION_LAYER_MOB_BULLET))
 
     # Add PlayerWeapon if available
     if 'weapon_data' in db_data and db_data['weapon_data']:
         wd = db_data['weapon_data']
         world.add_component(player_eid, PlayerWeapon(wd['placements'], wd['bullet_sprite_path'], wd['bullet_hitbox_path'], wd['speed'], wd['damage']))
+        # Warm the bullet assets now, like the mob pool does, so the first shot doesn't read the disk
+        world.assets.hitbox(wd['bullet_hitbox_path'])
+        world.assets.sprite(wd['bullet_sprite_path'])
         print(f"Player weapon damage: {wd['damage']}")
 
     # Add player health
@@ -248,17 +165,17 @@ def main():
     world.add_component(player_eid, Health(player_hp))
     print(f"Player health: {player_hp} HP")
 
-    # Load level data and create level manager
-    level_data = load_level_data(1)  # Load level 1
+    # Create level manager
     level_manager_eid = world.add_entity()
-    world.add_component(level_manager_eid, LevelManager(1, level_data['events'], level_data['mob_cache']))
+    world.add_component(level_manager_eid, LevelManager(1, level_data['events'], level_data['mob_cache'], level_data['formations']))
     print(f"Loaded level 1 with {len(level_data['events'])} events")
     
     # Store flight plans globally for spawning (could be improved)
     world.flight_plans = level_data['flight_plans']
+    world.flight_paths = FlightPathTable.from_level(level_data['flight_plans'], level_data['flight_plan_info'])
 
     # Add systems (Order matters for some systems, e.g., HitboxUpdate before Collision)
-    world.add_system(InputSystem(world, player_eid))
+    world.add_system(InputSystem(world, player_eid, key_source))
     world.add_system(MovementSystem(world))
     world.add_system(CullingSystem(world))  # Add after Movement
     world.add_system(FlightSystem(world))  # Add after MovementSystem
@@ -266,16 +183,34 @@ def main():
     # HitboxUpdateSystem should run after movement/rotation but before collision detection
     world.add_system(HitboxUpdateSystem(world))
     world.add_system(CollisionSystem(world)) 
+    DamageSystem(world)  # Reacts to CollisionEvents when the world dispatches events
     world.add_system(BoundarySystem(world)) # Boundary system might use hitboxes later, or just position
     world.add_system(CleanupSystem(world))  # Add after Boundary to clean up off-screen
     world.add_system(LevelSystem(world))  # Add before RenderSystem
-    world.add_system(RenderSystem(world, screen))
+    if screen is not None:
+        world.add_render_system(RenderSystem(world, screen))
+    if cfg.EVENT_LOG_ENABLED:
+        EventLogger(world.events, cfg.EVENT_LOG_MAX_LINES_PER_SECOND)
+    world.db = db
+    db.freeze()  # Everything is preloaded; systems must not touch the disk during frames
+    return world
+
+def main():
+    # Initialize pygame
+    pygame.init()
+    screen = pygame.display.set_mode((cfg.SCREEN_WIDTH, cfg.SCREEN_HEIGHT))
+    # Use config alias for window caption
+    pygame.display.set_caption(cfg.WINDOW_CAPTION)
+    clock = pygame.time.Clock()
+    world = build_world(screen)
     
-    # Game loop
+    # Game loop: simulate in fixed ticks, render once per displayed frame
+    tick = 1.0 / cfg.SIM_TICK_RATE
+    accumulator = 0.0
     running = True
     while running:
-        # Use config alias
-        dt = clock.tick(cfg.TARGET_FPS) / 1000.0
+        # Clamp hitches so a long stall doesn't trigger a burst of catch-up ticks
+        accumulator += min(clock.tick(cfg.TARGET_FPS) / 1000.0, cfg.MAX_FRAME_TIME)
         
         # Process events
         for event in pygame.event.get():
@@ -284,12 +219,35 @@ def main():
             elif event.type == pygame.KEYDOWN:
                 if event.key == pygame.K_ESCAPE:
                     running = False
+                elif event.key == pygame.K_F5:
+                    # Drop cached sprites/hitboxes edited on disk; new spawns pick them up
+                    # (sprites served from the atlas change only after re-running atlas_packer.py)
+                    for path in world.assets.refresh():
+                        print(f"Reloading changed asset {path}")
+                elif event.key == pygame.K_F9:
+                    # First press starts tracing, later presses export what the ring buffer holds
+                    if world.tracer.enabled:
+                        print(f"Trace written to {world.tracer.export()}")
+                    else:
+                        world.tracer.enabled = True
+                        print("Tracing started")
         
         # Update world
-        world.update(dt)
+        while accumulator >= tick:
+            world.update(tick)
+            accumulator -= tick
+        world.render(accumulator / tick if cfg.RENDER_INTERPOLATION else 1.0)
+        world.tracer.write_spikes()  # Outside the tick, so the export doesn't show up as the next spike
     
+    world.tracer.write_spikes()
+    for pool_type, stats in world.pool_manager.report().items():
+        print(f"Pool {pool_type}: {stats}")
+
     # On quit, e.g., save score=100, level=2
-    save_player_data(1, {'Score': 100, 'Current_Level_ID': 2})
+    db = world.db  # The save lives in the DB even when the level came from a pack
+    db.thaw()
+    db.save_player(1, {'Score': 100, 'Current_Level_ID': 2})
+    db.close()
 
     pygame.quit()
     sys.exit()
@@ -0,0 +1,59 @@
+import os
+import pygame
+from .hitbox_loader import load_hitbox_from_json
+from .hitbox_batch import CompiledHitbox
+
+
+def _mtime(path):
+    try:
+        return os.path.getmtime(path)
+    except OSError:
+        return None
+
+
+class AssetRegistry:
+    """ Loads each sprite and hitbox file once and shares the result.
+
+    Returned surfaces and CompiledHitbox objects are shared between every
+    entity that asks for the same path, so callers must treat them as
+    read-only. Sprites packed into the atlas are served from it; only sprites
+    missing from the atlas are loaded from disk. Entries remember the file's
+    mtime when loaded; refresh() drops the ones whose file changed so the next
+    request reloads them.
+    """
+
+    def __init__(self, atlas=None):
+        self.atlas = atlas  # atlas key (sprite path): subsurface
+        self._sprites = {}  # path: (mtime, surface)
+        self._hitboxes = {}  # path: (mtime, CompiledHitbox)
+
+    def sprite(self, path):
+        if self.atlas is not None and path in self.atlas:
+            return self.atlas[path]
+        entry = self._sprites.get(path)
+        if entry is None:
+            entry = (_mtime(path), pygame.image.load(path))
+            self._sprites[path] = entry
+        return entry[1]
+
+    def hitbox(self, path):
+        """ Returns the CompiledHitbox for a hitbox JSON file (empty if it failed to load). """
+        entry = self._hitboxes.get(path)
+        if entry is None:
+            entry = (_mtime(path), CompiledHitbox(load_hitbox_from_json(path)))
+            self._hitboxes[path] = entry
+        return entry[1]
+
+    def add_hitbox(self, path, shapes):
+        """ Registers already-loaded shapes for path (e.g. from a level pack) so the JSON isn't read. """
+        self._hitboxes[path] = (_mtime(path), CompiledHitbox(shapes))
+
+    def refresh(self):
+        """ Invalidates entries whose file mtime changed. Returns the invalidated paths. """
+        stale = []
+        for cache in (self._sprites, self._hitboxes):
+            for path, (mtime, _) in list(cache.items()):
+                if _mtime(path) != mtime:
+                    del cache[path]
+                    stale.append(path)
+        return stale
@@ -0,0 +1,73 @@
+import os
+import struct
+import pygame
+
+# Binary atlas manifest written by atlas_packer.py:
+#   header:  magic, version, page count, entry count
+#   pages:   u16 name length + utf-8 file name (relative to the manifest)
+#   entries: page, x, y, w, h, u16 key length + utf-8 key
+# Keys are the sprite paths stored in the DB, e.g. 'assets/sprites/mob_0001.png'.
+MANIFEST_MAGIC = b'SVAT'
+MANIFEST_VERSION = 1
+HEADER = struct.Struct('<4sHHH')
+ENTRY = struct.Struct('<HHHHH')
+STRING_LENGTH = struct.Struct('<H')
+
+
+def _pack_string(text):
+    data = text.encode('utf-8')
+    return STRING_LENGTH.pack(len(data)) + data
+
+
+def _unpack_string(buffer, offset):
+    (length,) = STRING_LENGTH.unpack_from(buffer, offset)
+    offset += STRING_LENGTH.size
+    return buffer[offset:offset + length].decode('utf-8'), offset + length
+
+
+def write_manifest(path, pages, entries):
+    """ Writes a manifest. pages is a list of file names, entries a dict key: (page, x, y, w, h). """
+    parts = [HEADER.pack(MANIFEST_MAGIC, MANIFEST_VERSION, len(pages), len(entries))]
+    parts.extend(_pack_string(page) for page in pages)
+    for key, (page, x, y, w, h) in sorted(entries.items()):
+        parts.append(ENTRY.pack(page, x, y, w, h))
+        parts.append(_pack_string(key))
+    with open(path, 'wb') as f:
+        f.write(b''.join(parts))
+
+
+def read_manifest(path):
+    """ Parses a manifest in a single read. Returns (pages, entries) as passed to write_manifest. """
+    with open(path, 'rb') as f:
+        buffer = f.read()
+    magic, version, page_count, entry_count = HEADER.unpack_from(buffer, 0)
+    if magic != MANIFEST_MAGIC or version != MANIFEST_VERSION:
+        raise ValueError(f"{path} is not a version {MANIFEST_VERSION} atlas manifest")
+    offset = HEADER.size
+    pages = []
+    for _ in range(page_count):
+        page, offset = _unpack_string(buffer, offset)
+        pages.append(page)
+    entries = {}
+    for _ in range(entry_count):
+        rect = ENTRY.unpack_from(buffer, offset)
+        key, offset = _unpack_string(buffer, offset + ENTRY.size)
+        entries[key] = rect
+    return pages, entries
+
+
+def load_atlas(manifest_path):
+    """ Loads every atlas page once and returns a dict of atlas key: subsurface.
+
+    Pages are converted to the display format when a display mode is set, so
+    every subsurface blits without per-pixel conversion.
+    """
+    pages, entries = read_manifest(manifest_path)
+    base = os.path.dirname(manifest_path)
+    surfaces = []
+    for page in pages:
+        surface = pygame.image.load(os.path.join(base, page))
+        if pygame.display.get_surface() is not None:
+            surface = surface.convert_alpha()
+        surfaces.append(surface)
+    return {key: surfaces[page].subsurface((x, y, w, h)) for key, (page, x, y, w, h) in entries.items()}
@@ -1,4 +1,5 @@
 import math
+import numpy as np
 import pygame # For pygame.math.Vector2 if needed for more complex SAT
 
 # Placeholder for actual collision functions. 
@@ -214,4 +215,49 @@ def get_square_vertices(center_x, center_y, width, height, angle_degrees) -> lis
         rotated_y = x * sin_a + y * cos_a
         # Translate to world position
         world_corners.append((center_x + rotated_x, center_y + rotated_y))
-    return world_corners 
\ No newline at end of file
+    return world_corners 
+
+# --- Batched Collision Kernels ---
+# Vectorized counterparts of the functions above, testing many shape pairs per call.
+# Boxes are given as centres (K, 2), axes (K, 2) holding (cos, sin) of the box's
+# world angle, and half extents (K, 2). Each returns a (K,) boolean hit mask.
+# Touching counts as a hit, matching the scalar functions.
+
+def batch_circle_circle_collision(centers1, radii1, centers2, radii2):
+    d = centers2 - centers1
+    radii_sum = radii1 + radii2
+    return d[:, 0] * d[:, 0] + d[:, 1] * d[:, 1] <= radii_sum * radii_sum
+
+def batch_square_square_collision(centers1, axes1, half1, centers2, axes2, half2):
+    """
+    Closed-form SAT for oriented boxes: only the two edge normals of each box
+    need testing, and the projected radii come straight from the rotation terms.
+    """
+    c1, s1 = axes1[:, 0], axes1[:, 1]
+    c2, s2 = axes2[:, 0], axes2[:, 1]
+    tx = centers2[:, 0] - centers1[:, 0]
+    ty = centers2[:, 1] - centers1[:, 1]
+    # Box 1 axes are (c1, s1) and (-s1, c1); likewise for box 2
+    r00 = np.abs(c1 * c2 + s1 * s2)
+    r01 = np.abs(s1 * c2 - c1 * s2)
+    r10 = r01
+    r11 = r00
+    hx1, hy1 = half1[:, 0], half1[:, 1]
+    hx2, hy2 = half2[:, 0], half2[:, 1]
+
+    hit = np.abs(tx * c1 + ty * s1) <= hx1 + hx2 * r00 + hy2 * r01
+    hit &= np.abs(-tx * s1 + ty * c1) <= hy1 + hx2 * r10 + hy2 * r11
+    hit &= np.abs(tx * c2 + ty * s2) <= hx1 * r00 + hy1 * r10 + hx2
+    hit &= np.abs(-tx * s2 + ty * c2) <= hx1 * r01 + hy1 * r11 + hy2
+    return hit
+
+def batch_circle_square_collision(circle_centers, radii, square_centers, square_axes, square_half):
+    """ Clamps each circle centre into its box's local frame and compares the distance to the radius. """
+    c, s = square_axes[:, 0], square_axes[:, 1]
+    tx = circle_centers[:, 0] - square_centers[:, 0]
+    ty = circle_centers[:, 1] - square_centers[:, 1]
+    local_x = tx * c + ty * s
+    local_y = -tx * s + ty * c
+    dx = local_x - np.clip(local_x, -square_half[:, 0], square_half[:, 0])
+    dy = local_y - np.clip(local_y, -square_half[:, 1], square_half[:, 1])
+    return dx * dx + dy * dy <= radii * radii
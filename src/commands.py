@@ -0,0 +1,69 @@
+# Deferred structural changes. Systems record them while iterating and the World
+# applies them in one pass at the end of update(), after events are dispatched.
+CREATE, REMOVE, ADD_COMPONENT, REMOVE_COMPONENT = range(4)
+
+
+class CommandBuffer:
+    """ Per-frame queue of create/remove/add/remove-component operations.
+
+    remove() of an entity owned by a pool returns it through
+    PoolManager.return_to_pool instead of destroying it, so pools keep their
+    size. Entities queued for removal are in `removed` until the flush, which
+    lets later code in the same frame skip them.
+    """
+
+    def __init__(self, world):
+        self.world = world
+        self.commands = []  # (op, entity, payload)
+        self.removed = set()
+
+    def __len__(self):
+        return len(self.commands)
+
+    def create(self, components=()):
+        """ Reserves an entity id now; the entity and its components appear at the flush. """
+        entity = self.world.reserve_entity()
+        self.commands.append((CREATE, entity, tuple(components)))
+        return entity
+
+    def remove(self, entity):
+        """ Queues entity for removal. Returns False if it was already queued this frame. """
+        if entity in self.removed:
+            return False
+        self.removed.add(entity)
+        self.commands.append((REMOVE, entity, None))
+        return True
+
+    def add_component(self, entity, component):
+        self.commands.append((ADD_COMPONENT, entity, component))
+
+    def remove_component(self, entity, component_type):
+        self.commands.append((REMOVE_COMPONENT, entity, component_type))
+
+    def flush(self):
+        """ Applies every queued command in order. Operations on entities removed earlier in the batch are dropped. """
+        if not self.commands:
+            return
+        world = self.world
+        pools = world.pool_manager
+        commands, self.commands = self.commands, []
+        gone = set()
+        for op, entity, payload in commands:
+            if entity in gone:
+                continue
+            if op == ADD_COMPONENT:
+                world.add_component(entity, payload)
+            elif op == REMOVE_COMPONENT:
+                world.remove_component(entity, payload)
+            elif op == REMOVE:
+                gone.add(entity)
+                pool_type = pools.pool_of(entity)
+                if pool_type is not None:
+                    pools.return_to_pool(pool_type, entity)
+                else:
+                    world.remove_entity(entity)
+            else:
+                world.add_entity(entity)
+                for component in payload:
+                    world.add_component(entity, component)
+        self.removed.clear()
@@ -1,3 +1,5 @@
+from .timeline import Timeline
+
 class Position:
     def __init__(self, x, y):
         self.x = x
@@ -38,7 +40,7 @@ class Acceleration:
 
 # New Hitbox component
 class Hitbox:
-    def __init__(self, local_shapes: list[dict]):
+    def __init__(self, local_shapes: list[dict], compiled=None):
         """ Initializes the Hitbox component.
 
         Args:
@@ -46,9 +48,26 @@ class Hitbox:
                                        Each dict should define 'type', 'local_x', 'local_y', 
                                        and shape-specific attributes like 'radius' or 'width'/'height',
                                        and optionally 'local_angle_degrees'.
+            compiled (CompiledHitbox): Optional precompiled array form of local_shapes.
+                                       HitboxUpdateSystem compiles it on first use if omitted.
         """
         self.local_shapes = local_shapes # Loaded from JSON, defining shapes in local space
-        self.current_world_shapes = [] # To be populated by HitboxUpdateSystem with transformed shapes 
+        self.compiled = compiled
+        # World-space shapes are written by HitboxUpdateSystem into world.hitbox_buffers
+
+class CollisionLayer:
+    def __init__(self, layer, mask):
+        """ Initializes the CollisionLayer component.
+
+        Two entities are only tested for collision when each one's layer bit is
+        in the other's mask. Entities without this component collide with everything.
+
+        Args:
+            layer (int): Bit(s) this entity occupies, e.g. cfg.COLLISION_LAYER_MOB.
+            mask (int): Bits of the layers this entity can collide with.
+        """
+        self.layer = layer
+        self.mask = mask
 
 class PlayerWeapon:
     def __init__(self, placements, bullet_sprite_path, bullet_hitbox_path, speed, damage):
@@ -78,13 +97,29 @@ class FlightPlan:
         self.start_time = start_time
         self.completed = False
 
+class Formation:
+    """ A squadron flying one flight plan together. Shared by its members, not a component itself. """
+    def __init__(self, formation_id, plan_id, start_time, offsets, delays):
+        self.formation_id = formation_id
+        self.plan_id = plan_id
+        self.start_time = start_time
+        self.offsets = offsets  # Per member (x, y) from the plan's position
+        self.delays = delays  # Per member seconds behind the plan's start
+
+class FormationMember:
+    def __init__(self, formation, index):
+        self.formation = formation
+        self.index = index  # Into the formation's offsets and delays
+        self.completed = False
+
 class LevelManager:
-    def __init__(self, level_id, events, mob_cache):
+    def __init__(self, level_id, events, mob_cache, formations=None):
         self.level_id = level_id
         self.events = events  # List of level event dicts
         self.game_time = 0.0
-        self.spawned_events = set()
+        self.timeline = Timeline(events)  # Releases events as game_time reaches them
         self.mob_cache = mob_cache 
+        self.formations = formations or {}  # Formation_ID: ordered member rows
 
 class IsActive:
     def __init__(self, active=False):
@@ -96,5 +131,5 @@ class IsVisible:
 
 class AtlasReference:
     def __init__(self, atlas_key, frame=0):
-        self.atlas_key = atlas_key  # Key in atlas dict, e.g. 'bullet'
+        self.atlas_key = atlas_key  # Key in atlas dict: the sprite path, e.g. 'assets/sprites/mob_0001.png'
         self.frame = frame  # For animations 
\ No newline at end of file
@@ -8,10 +8,57 @@ PLAYER_MAX_SPEED = 250      # Max speed in pixels per second
 PLAYER_ACCELERATION = 1000  # Pixels per second squared
 PLAYER_DAMPING_FACTOR = 1 # How quickly player slows down (higher = faster slowdown)
 
-TARGET_FPS = 60
+TARGET_FPS = 60  # Render rate cap
+SIM_TICK_RATE = 120  # Fixed simulation steps per second, independent of TARGET_FPS
+MAX_FRAME_TIME = 0.25  # Longest frame the simulation catches up on, in seconds
+RENDER_INTERPOLATION = True  # Draw positions blended between the last two ticks
+
+# Pack Position/Velocity/Acceleration/Rotation/Health/Damage into typed columns
+COLUMNAR_STORAGE = True
+# Integrate movement on whole columns with NumPy (requires COLUMNAR_STORAGE)
+VECTORIZED_MOVEMENT = True
 
 WINDOW_CAPTION = "Space Vault" 
 
 # Asset Management
-ATLAS_JSON_PATH = 'assets/atlas.json'
-CAMERA_BUFFER = 50  # Pixels beyond screen for culling 
\ No newline at end of file
+GAME_DB_PATH = 'GameDB.db'
+LEVEL_PACK_PATH = 'assets/levels/level_{level}.pack'  # Written by level_packer.py
+USE_LEVEL_PACK = True  # Load levels from the pack when it exists instead of GameDB.db
+MOB_HITBOX_PATH = 'assets/hitboxes/mob_01_v1.json'
+ATLAS_MANIFEST_PATH = 'assets/atlas/atlas.bin'  # Written by atlas_packer.py
+DEFAULT_BULLET_SPRITE = 'assets/sprites/basic_bullet_0001.png'
+DEFAULT_MOB_SPRITE = 'assets/sprites/mob_0001.png'
+CAMERA_BUFFER = 50  # Pixels beyond screen for culling
+
+# Rendering
+ROTATION_CACHE_STEPS = 72  # Quantized angles per sprite (5 degrees apart)
+ROTATION_CACHE_SIZE = 1024  # Max rotated surfaces kept (LRU)
+ROTATION_CACHE_PREBAKE = False  # Render every step of every atlas key at startup
+RENDER_DIRTY_RECTS = False  # Only clear and update regions sprites covered last frame or cover now
+
+# Collision
+COLLISION_CELL_SIZE = 100  # Spatial hash cell size; keep above the largest hitbox
+BATCHED_NARROW_PHASE = True  # NumPy batch kernels; False uses the scalar collision_utils functions
+
+# Collision layer bits (see components.CollisionLayer)
+COLLISION_LAYER_PLAYER = 1 << 0
+COLLISION_LAYER_PLAYER_BULLET = 1 << 1
+COLLISION_LAYER_MOB = 1 << 2
+COLLISION_LAYER_MOB_BULLET = 1 << 3
+COLLISION_LAYER_ALL = -1  # Layer/mask for entities without a CollisionLayer
+
+# Tracing (F9 starts recording, then exports; view in chrome://tracing or ui.perfetto.dev)
+TRACE_ENABLED = False
+TRACE_BUFFER_SPANS = 20000  # Ring buffer size; older spans are dropped
+TRACE_SPIKE_MS = 1000.0 / SIM_TICK_RATE  # Export automatically when a simulation tick takes longer than its budget (None to disable)
+TRACE_OUTPUT_DIR = 'traces'
+
+# Event logging (printed after the frame's systems ran, rate-limited)
+EVENT_LOG_ENABLED = True
+EVENT_LOG_MAX_LINES_PER_SECOND = 20
+
+# Entity pools (grow by a chunk when empty; check PoolManager.report() to size them)
+BULLET_POOL_SIZE = 500
+BULLET_POOL_GROW = 100
+MOB_POOL_SIZE = 50
+MOB_POOL_GROW = 10
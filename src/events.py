@@ -0,0 +1,122 @@
+import time
+
+# Typed gameplay events. Systems emit them while iterating and never react
+# inline; subscribers receive each type as one list after all systems ran.
+
+
+class CollisionEvent:
+    __slots__ = ('entity_a', 'entity_b')
+
+    def __init__(self, entity_a, entity_b):
+        self.entity_a = entity_a
+        self.entity_b = entity_b
+
+
+class DamageEvent:
+    __slots__ = ('source', 'target', 'amount', 'current_hp', 'max_hp')
+
+    def __init__(self, source, target, amount, current_hp, max_hp):
+        self.source = source
+        self.target = target
+        self.amount = amount
+        self.current_hp = current_hp
+        self.max_hp = max_hp
+
+
+class DespawnEvent:
+    __slots__ = ('entity', 'reason')
+
+    def __init__(self, entity, reason):
+        self.entity = entity
+        self.reason = reason  # e.g. 'hit', 'destroyed', 'offscreen', 'completed', 'exit'
+
+
+class LevelEvent:
+    __slots__ = ('level_id', 'event', 'phase')
+
+    def __init__(self, level_id, event, phase):
+        self.level_id = level_id
+        self.event = event  # The Levels row as a dict (Event, Message_ID, Background_ID, Cutscene_ID, ...)
+        self.phase = phase  # 'start', or 'end' once Event_Duration has elapsed
+
+
+class EventBus:
+    """ Per-type event queues drained in batches.
+
+    emit() only appends. dispatch() (called by World.update after the systems)
+    hands each subscriber the whole list of queued events of its type. Events
+    emitted by subscribers are delivered in further passes of the same dispatch.
+    """
+
+    MAX_PASSES = 8  # Guards against subscribers that keep emitting each other's events
+
+    def __init__(self):
+        self.queues = {}  # event type: list of pending events
+        self.subscribers = {}  # event type: list of handlers taking a list of events
+
+    def subscribe(self, event_type, handler):
+        self.subscribers.setdefault(event_type, []).append(handler)
+
+    def unsubscribe(self, event_type, handler):
+        handlers = self.subscribers.get(event_type)
+        if handlers and handler in handlers:
+            handlers.remove(handler)
+
+    def emit(self, event):
+        queue = self.queues.get(type(event))
+        if queue is None:
+            self.queues[type(event)] = [event]
+        else:
+            queue.append(event)
+
+    def pending(self, event_type):
+        return len(self.queues.get(event_type, ()))
+
+    def dispatch(self):
+        for _ in range(self.MAX_PASSES):
+            if not self.queues:
+                return
+            queues, self.queues = self.queues, {}
+            for event_type, events in queues.items():
+                for handler in self.subscribers.get(event_type, ()):
+                    handler(events)
+        self.queues.clear()  # Anything still pending would loop forever; drop it
+
+
+class EventLogger:
+    """ Optional subscriber that prints events, at most max_lines per interval seconds.
+
+    Lines over the limit are counted and reported as one summary line when the
+    next interval starts.
+    """
+
+    def __init__(self, bus, max_lines=20, interval=1.0):
+        self.max_lines = max_lines
+        self.interval = interval
+        self.window_start = time.perf_counter()
+        self.lines = 0
+        self.suppressed = 0
+        bus.subscribe(DamageEvent, self.on_damage)
+        bus.subscribe(DespawnEvent, self.on_despawn)
+
+    def _log(self, message):
+        now = time.perf_counter()
+        if now - self.window_start >= self.interval:
+            if self.suppressed:
+                print(f"... {self.suppressed} event lines suppressed")
+            self.window_start = now
+            self.lines = 0
+            self.suppressed = 0
+        if self.lines < self.max_lines:
+            self.lines += 1
+            print(message)
+        else:
+            self.suppressed += 1
+
+    def on_damage(self, events):
+        for e in events:
+            self._log(f"Entity {e.source} hit entity {e.target} for {e.amount} damage! Health: {e.current_hp}/{e.max_hp}")
+
+    def on_despawn(self, events):
+        for e in events:
+            self._log(f"Entity {e.entity} despawned ({e.reason})")
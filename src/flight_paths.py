@@ -0,0 +1,161 @@
+import math
+import numpy as np
+
+SAMPLES_PER_SEGMENT = 16  # Catmull-Rom samples between two waypoints of a 'curved' plan
+TIME_STEP = 1.0 / 240.0  # Resolution of the precomputed time -> distance profile
+DEFAULT_SPEED = 100.0
+MIN_SPEED_FRACTION = 0.05  # Decel never slows below this fraction of the target, so mobs always arrive
+KEY_STRIDE = float(1 << 24)  # Offset between paths in the concatenated lookup tables
+
+
+def _catmull_rom(points, closed):
+    """ Samples a uniform Catmull-Rom spline through points (closed loops wrap around). """
+    count = len(points)
+    pts = np.asarray(points, dtype=np.float64)
+    if closed:
+        padded = np.vstack([pts[-1], pts, pts[0], pts[1]])
+        segments = count
+    else:
+        padded = np.vstack([2 * pts[0] - pts[1], pts, 2 * pts[-1] - pts[-2]])
+        segments = count - 1
+    u = np.linspace(0.0, 1.0, SAMPLES_PER_SEGMENT, endpoint=False)[:, None]
+    u2, u3 = u * u, u * u * u
+    samples = []
+    for i in range(segments):
+        p0, p1, p2, p3 = padded[i], padded[i + 1], padded[i + 2], padded[i + 3]
+        samples.append(0.5 * (2 * p1 + (p2 - p0) * u + (2 * p0 - 5 * p1 + 4 * p2 - p3) * u2
+                              + (3 * p1 - p0 - 3 * p2 + p3) * u3))
+    samples.append(pts[0:1] if closed else pts[-1:])
+    knot_rows = np.arange(segments + 1) * SAMPLES_PER_SEGMENT
+    return np.vstack(samples), knot_rows
+
+
+class CompiledFlightPath:
+    """ One flight plan as an arc-length parameterized path plus a time -> distance profile.
+
+    Waypoints are joined by straight lines ('linear') or a Catmull-Rom spline
+    ('curved'). Travel along each leg follows the target waypoint's Speed,
+    ramping with its Accel and slowing into it with its Decel (px/s^2), and a
+    leg doesn't start before the target's Waypoint_Time_Offset. Looping plans
+    (Loop_Count -1 forever, or n > 1 laps) get a closing leg back to the start.
+    Everything is precomputed, so the position at a given elapsed time is
+    always the same. Raises ValueError for a negative Speed, Accel or Decel, or
+    a path too long for FlightPathTable's key stride.
+    """
+
+    def __init__(self, waypoints, path_type='linear', loop_count=1):
+        self.loop_count = -1 if loop_count is not None and loop_count < 0 else max(loop_count or 1, 1)
+        self.exit_at_end = bool(waypoints) and waypoints[-1].get('Action') == 'exit' and self.loop_count == 1
+        points = [(float(wp['X']), float(wp['Y'])) for wp in waypoints] or [(0.0, 0.0)]
+        legs = list(waypoints[1:])  # The waypoint each leg heads to
+        closed = self.loop_count != 1 and len(points) > 1
+        if closed:
+            legs.append(waypoints[0])
+
+        if path_type == 'curved' and len(points) > 2:
+            samples, knot_rows = _catmull_rom(points, closed)
+        else:
+            samples = np.asarray(points + ([points[0]] if closed else []), dtype=np.float64)
+            knot_rows = np.arange(len(samples))
+        steps = np.hypot(np.diff(samples[:, 0]), np.diff(samples[:, 1]))
+        self.distance = np.concatenate([[0.0], np.cumsum(steps)])
+        self.x = samples[:, 0].copy()
+        self.y = samples[:, 1].copy()
+        self.length = float(self.distance[-1])
+        self.start = points[0]
+        self.times, self.dists = self._profile(legs, self.distance[knot_rows])
+        self.duration = float(self.times[-1])
+        if self.duration >= KEY_STRIDE or self.length >= KEY_STRIDE:
+            raise ValueError("Flight path too long for the lookup key stride")
+
+    @staticmethod
+    def _profile(legs, knot_distance):
+        times, dists = [0.0], [0.0]
+        t = d = v = 0.0
+        for leg, start, end in zip(legs, knot_distance[:-1], knot_distance[1:]):
+            hold = leg.get('Waypoint_Time_Offset') or 0.0
+            if t < hold:
+                t, v = hold, 0.0
+                times.append(t)
+                dists.append(d)
+            target = float(leg.get('Speed') or DEFAULT_SPEED)
+            accel = leg.get('Accel')
+            decel = leg.get('Decel')
+            # A negative rate would never reach the waypoint, and the loop below would never end
+            if target < 0 or (accel or 0) < 0 or (decel or 0) < 0:
+                raise ValueError(f"Waypoint {leg.get('Waypoint_ID')} needs a positive Speed and non-negative Accel/Decel")
+            if not accel:
+                v = target
+            d = start
+            while d < end:
+                if accel and v < target:
+                    v = min(target, v + accel * TIME_STEP)
+                elif not accel or v > target:
+                    v = target
+                speed = v
+                if decel:
+                    speed = max(min(v, math.sqrt(2.0 * decel * (end - d))), target * MIN_SPEED_FRACTION)
+                d = min(end, d + speed * TIME_STEP)
+                t += TIME_STEP
+                times.append(t)
+                dists.append(d)
+            if decel:
+                v = 0.0
+        return np.asarray(times), np.asarray(dists)
+
+
+class FlightPathTable:
+    """ Every compiled path of a level, laid out for one-pass evaluation.
+
+    Each path's time and distance tables are concatenated with a per-path key
+    offset (KEY_STRIDE), so positions for any mix of mobs on any paths come from
+    two np.interp calls over the whole batch.
+    """
+
+    def __init__(self, paths):
+        self.paths = paths  # plan id: CompiledFlightPath
+        self.index_of = {plan_id: i for i, plan_id in enumerate(paths)}
+        compiled = list(paths.values())
+        offsets = [i * KEY_STRIDE for i in range(len(compiled))]
+        self.time_keys = np.concatenate([o + p.times for o, p in zip(offsets, compiled)] or [np.zeros(1)])
+        self.time_dists = np.concatenate([p.dists for p in compiled] or [np.zeros(1)])
+        self.dist_keys = np.concatenate([o + p.distance for o, p in zip(offsets, compiled)] or [np.zeros(1)])
+        self.xs = np.concatenate([p.x for p in compiled] or [np.zeros(1)])
+        self.ys = np.concatenate([p.y for p in compiled] or [np.zeros(1)])
+        self.durations = np.array([max(p.duration, TIME_STEP) for p in compiled])
+        self.loop_counts = np.array([p.loop_count for p in compiled], dtype=np.int64)
+        self.exit_at_end = np.array([p.exit_at_end for p in compiled], dtype=bool)
+
+    @classmethod
+    def from_level(cls, flight_plans, flight_plan_info=None):
+        """ Compiles {plan id: waypoint dicts} using each plan's Path_Type and Loop_Count.
+
+        A plan with invalid waypoints is reported and left out, so its spawns are skipped.
+        """
+        flight_plan_info = flight_plan_info or {}
+        paths = {}
+        for plan_id, waypoints in flight_plans.items():
+            info = flight_plan_info.get(plan_id, {})
+            try:
+                paths[plan_id] = CompiledFlightPath(waypoints, info.get('Path_Type') or 'linear', info.get('Loop_Count'))
+            except ValueError as e:
+                print(f"Skipping flight plan {plan_id}: {e}")
+        return cls(paths)
+
+    def __contains__(self, plan_id):
+        return plan_id in self.index_of
+
+    def evaluate(self, path_index, elapsed):
+        """ Positions for mobs on paths path_index after elapsed seconds.
+
+        Returns (x, y, finished) arrays; finished mobs sit at the end of their path.
+        """
+        durations = self.durations[path_index]
+        laps = np.floor(np.maximum(elapsed, 0.0) / durations)
+        loops = self.loop_counts[path_index]
+        finished = (loops > 0) & (laps >= loops)
+        local = np.where(finished, durations, np.maximum(elapsed, 0.0) - laps * durations)
+        offset = path_index * KEY_STRIDE
+        dist = np.interp(offset + local, self.time_keys, self.time_dists)
+        key = offset + dist
+        return np.interp(key, self.dist_keys, self.xs), np.interp(key, self.dist_keys, self.ys), finished
@@ -0,0 +1,221 @@
+import hashlib
+import json
+import sqlite3
+
+# SQL is kept in constants so sqlite3's statement cache reuses the compiled
+# statements for the life of the connection.
+SELECT_PLAYER = 'SELECT * FROM Player WHERE Player_ID = ?'
+INSERT_DEFAULT_PLAYER = '''
+    INSERT INTO Player (Create_Date, Current_Ship_ID, Current_Weapon_ID, Current_Level_ID, Items, Score, Lives, Last_Save_Date)
+    VALUES (strftime("%s","now"), 1, 1, 1, "{}", 0, 3, strftime("%s","now"))'''
+SELECT_SHIP = 'SELECT * FROM Ships WHERE Ship_ID = ?'
+INSERT_DEFAULT_SHIP = '''
+    INSERT INTO Ships (Ship_Level, Ship_Mod, Ship_HP, Ship_Sprite_Path, Ship_Hitbox_Path)
+    VALUES (1, "v1", 100, "assets/sprites/Sprite-0001.png", "assets/hitboxes/main_ship_v1.json")'''
+UPDATE_PLAYER_SHIP = 'UPDATE Player SET Current_Ship_ID = ? WHERE Player_ID = ?'
+# Weapon, its projectile and the placements for the current ship sprite in one query
+SELECT_WEAPON = '''
+    SELECT w.Weapon_ID, w.Projectile_ID, p.Projectile_Sprite_Path, p.Projectile_Hitbox_Path,
+           p.Projectile_Base_Speed, p.Projectile_Damage, wp.Placements_JSON
+    FROM Weapons w
+    LEFT JOIN Projectiles p ON p.Projectile_ID = w.Projectile_ID
+    LEFT JOIN WeaponPlacements wp ON wp.Weapon_ID = w.Weapon_ID AND wp.Sprite_Path = ?
+    WHERE w.Weapon_ID = ?'''
+SELECT_FIRST_MOB = 'SELECT * FROM Mobs LIMIT 1'
+INSERT_DEFAULT_MOB = '''
+    INSERT INTO Mobs (Mob_Name, Mob_Level, Mob_HP, Mob_Sprite_Path)
+    VALUES ('Basic Enemy', 1, 30, 'assets/sprites/mob_0001.png')'''
+SELECT_MOB = 'SELECT * FROM Mobs WHERE Mob_ID = ?'
+# Level preload: one set-based query per table, joined against the level's events
+SELECT_LEVEL_EVENTS = 'SELECT * FROM Levels WHERE Level = ? ORDER BY Event_Start'
+SELECT_LEVEL_WAYPOINTS = '''
+    SELECT * FROM Waypoints
+    WHERE Flight_Plan_ID IN (SELECT Flight_Plan_ID FROM Levels WHERE Level = ? AND Flight_Plan_ID IS NOT NULL)
+    ORDER BY Flight_Plan_ID, Waypoint_Step'''
+SELECT_LEVEL_FLIGHT_PLANS = '''
+    SELECT * FROM FlightPlans
+    WHERE Flight_Plan_ID IN (SELECT Flight_Plan_ID FROM Levels WHERE Level = ? AND Flight_Plan_ID IS NOT NULL)'''
+# Definitions for level packs: every ship, weapon and mob, keyed by ID
+SELECT_SHIPS = 'SELECT * FROM Ships ORDER BY Ship_ID'
+SELECT_WEAPONS = '''
+    SELECT w.Weapon_ID, w.Projectile_ID, p.Projectile_Sprite_Path, p.Projectile_Hitbox_Path,
+           p.Projectile_Base_Speed, p.Projectile_Damage
+    FROM Weapons w
+    LEFT JOIN Projectiles p ON p.Projectile_ID = w.Projectile_ID
+    ORDER BY w.Weapon_ID'''
+SELECT_PLACEMENTS = 'SELECT * FROM WeaponPlacements ORDER BY Placement_ID'
+SELECT_MOBS = 'SELECT * FROM Mobs ORDER BY Mob_ID'
+# Everything a level pack is built from. Player (the save) is left out, so saving doesn't make packs stale.
+PACK_SOURCE_TABLES = ('Ships', 'Weapons', 'Projectiles', 'WeaponPlacements', 'Mobs',
+                      'Levels', 'Waypoints', 'FlightPlans', 'Formations')
+SELECT_PACK_SOURCE = {table: f'SELECT * FROM {table} ORDER BY rowid' for table in PACK_SOURCE_TABLES}
+SELECT_LEVEL_FORMATIONS = '''
+    SELECT * FROM Formations
+    WHERE Formation_ID IN (SELECT Formation_ID FROM Levels WHERE Level = ? AND Formation_ID IS NOT NULL)
+    ORDER BY Formation_ID, Member_Index'''
+SELECT_LEVEL_MOBS = '''
+    SELECT * FROM Mobs
+    WHERE Mob_ID IN (SELECT Mob_ID FROM Levels WHERE Level = ? AND Mob_ID IS NOT NULL)'''
+
+DEFAULT_PLAYER_DATA = {
+    'ship_data': {'Ship_Sprite_Path': 'assets/sprites/Sprite-0001.png',
+                  'Ship_Hitbox_Path': 'assets/hitboxes/main_ship_v1.json', 'Ship_HP': 100},
+    'weapon_data': {'placements': [], 'bullet_sprite_path': 'assets/sprites/basic_bullet_0001.png',
+                    'bullet_hitbox_path': 'assets/hitboxes/basic_bullet_v1.json', 'speed': 300, 'damage': 10},
+    'mob_data': {'Mob_HP': 30, 'Mob_Sprite_Path': 'assets/sprites/mob_0001.png'},
+}
+
+
+def make_weapon_data(weapon_row, placements):
+    """ PlayerWeapon settings from a weapon row joined with its projectile (see SELECT_WEAPON). """
+    return {
+        'placements': placements,
+        'bullet_sprite_path': weapon_row['Projectile_Sprite_Path'],
+        'bullet_hitbox_path': weapon_row['Projectile_Hitbox_Path'],
+        'speed': weapon_row['Projectile_Base_Speed'] or 300,
+        'damage': weapon_row['Projectile_Damage'] or 10,
+    }
+
+
+class GameDB:
+    """ The game's single connection to GameDB.db.
+
+    Everything a level needs is loaded up front with a handful of set-based
+    queries and returned as plain dicts. Once the game loop starts, freeze()
+    makes any further query raise, so no system can hit the disk mid-frame;
+    thaw() re-allows access for loading the next level or saving.
+    """
+
+    def __init__(self, path='GameDB.db'):
+        self.path = path
+        self.conn = sqlite3.connect(path)
+        self.conn.row_factory = sqlite3.Row
+        self.frozen = False
+
+    def close(self):
+        self.conn.close()
+
+    def freeze(self):
+        self.frozen = True
+
+    def thaw(self):
+        self.frozen = False
+
+    def _execute(self, sql, params=()):
+        if self.frozen:
+            raise RuntimeError(f"GameDB queried while frozen (during the frame loop): {sql.split()[0]}")
+        return self.conn.execute(sql, params)
+
+    def _fetch_or_insert(self, select_sql, key, insert_sql):
+        row = self._execute(select_sql, (key,)).fetchone()
+        if row is None:
+            key = self._execute(insert_sql).lastrowid
+            self.conn.commit()
+            row = self._execute(select_sql, (key,)).fetchone()
+        return row
+
+    def load_save(self, player_id=1):
+        """ Returns the Player row (the save: current ship, weapon, level, ...), creating it if missing. """
+        return dict(self._fetch_or_insert(SELECT_PLAYER, player_id, INSERT_DEFAULT_PLAYER))
+
+    def load_definitions(self):
+        """ Every ship, weapon and mob, for building a level pack: {'ships', 'weapons', 'placements', 'mobs'}.
+
+        weapons are SELECT_WEAPONS rows (a weapon joined with its projectile), and
+        placements has one row per position: Weapon_ID, Sprite_Path, local_x, local_y.
+        """
+        placements = []
+        for row in self._execute(SELECT_PLACEMENTS):
+            for d in json.loads(row['Placements_JSON'] or '[]'):
+                placements.append({'Weapon_ID': row['Weapon_ID'], 'Sprite_Path': row['Sprite_Path'],
+                                   'local_x': d['local_x'], 'local_y': d['local_y']})
+        return {
+            'ships': [dict(row) for row in self._execute(SELECT_SHIPS)],
+            'weapons': [dict(row) for row in self._execute(SELECT_WEAPONS)],
+            'placements': placements,
+            'mobs': [dict(row) for row in self._execute(SELECT_MOBS)],
+        }
+
+    def source_digest(self):
+        """ SHA-256 over every table a level pack is built from, or None if they can't be read. """
+        digest = hashlib.sha256()
+        try:
+            for table in PACK_SOURCE_TABLES:
+                digest.update(table.encode('utf-8'))
+                for row in self._execute(SELECT_PACK_SOURCE[table]):
+                    digest.update(repr(tuple(row)).encode('utf-8'))
+        except sqlite3.Error:
+            return None
+        return digest.digest()
+
+    def load_player(self, player_id=1):
+        """ Returns {'ship_data', 'weapon_data', 'mob_data'}, creating default rows where missing. """
+        try:
+            player_row = self.load_save(player_id)
+            player_id = player_row['Player_ID']
+            ship_data = self._execute(SELECT_SHIP, (player_row['Current_Ship_ID'],)).fetchone()
+            if ship_data is None:
+                ship_id = self._execute(INSERT_DEFAULT_SHIP).lastrowid
+                self._execute(UPDATE_PLAYER_SHIP, (ship_id, player_id))
+                self.conn.commit()
+                ship_data = self._execute(SELECT_SHIP, (ship_id,)).fetchone()
+
+            weapon_id = player_row['Current_Weapon_ID']
+            weapon_row = self._execute(SELECT_WEAPON, (ship_data['Ship_Sprite_Path'], weapon_id)).fetchone()
+            weapon_data = {}
+            if weapon_row is None:
+                print(f"No weapon data for ID {weapon_id}")
+            elif weapon_row['Projectile_Sprite_Path'] is None:
+                print(f"No projectile data for ID {weapon_row['Projectile_ID']}")
+            else:
+                print(f"Loaded weapon {weapon_id} from DB")
+                placements = []
+                if weapon_row['Placements_JSON']:
+                    placements = [(d['local_x'], d['local_y']) for d in json.loads(weapon_row['Placements_JSON'])]
+                    print(f"Loaded {len(placements)} placements for weapon {weapon_id} on sprite {ship_data['Ship_Sprite_Path']}")
+                weapon_data = make_weapon_data(weapon_row, placements)
+
+            mob_data = self._execute(SELECT_FIRST_MOB).fetchone()
+            if mob_data is None:
+                mob_id = self._execute(INSERT_DEFAULT_MOB).lastrowid
+                self.conn.commit()
+                mob_data = self._execute(SELECT_MOB, (mob_id,)).fetchone()
+            return {'ship_data': dict(ship_data), 'weapon_data': weapon_data, 'mob_data': dict(mob_data)}
+        except (sqlite3.Error, ValueError, KeyError) as e:
+            # ValueError/KeyError: malformed Placements_JSON or a placement missing local_x/local_y
+            print(f"DB error: {e!r}. Falling back to defaults.")
+            return {key: dict(value) for key, value in DEFAULT_PLAYER_DATA.items()}
+
+    def load_level(self, level=1):
+        """ Preloads a level: {'events', 'flight_plans', 'flight_plan_info', 'formations', 'mob_cache'}.
+
+        flight_plans maps Flight_Plan_ID to its ordered waypoint dicts, flight_plan_info
+        to its FlightPlans row, formations maps Formation_ID to its ordered member rows
+        and mob_cache maps Mob_ID to its Mobs row.
+        """
+        try:
+            events = [dict(row) for row in self._execute(SELECT_LEVEL_EVENTS, (level,))]
+            flight_plans = {}
+            for row in self._execute(SELECT_LEVEL_WAYPOINTS, (level,)):
+                flight_plans.setdefault(row['Flight_Plan_ID'], []).append(dict(row))
+            flight_plan_info = {row['Flight_Plan_ID']: dict(row)
+                                for row in self._execute(SELECT_LEVEL_FLIGHT_PLANS, (level,))}
+            formations = {}
+            for row in self._execute(SELECT_LEVEL_FORMATIONS, (level,)):
+                formations.setdefault(row['Formation_ID'], []).append(dict(row))
+            mob_cache = {row['Mob_ID']: dict(row) for row in self._execute(SELECT_LEVEL_MOBS, (level,))}
+            return {'events': events, 'flight_plans': flight_plans, 'flight_plan_info': flight_plan_info,
+                    'formations': formations, 'mob_cache': mob_cache}
+        except sqlite3.Error as e:
+            print(f"Error loading level data: {e}")
+            return {'events': [], 'flight_plans': {}, 'flight_plan_info': {}, 'formations': {}, 'mob_cache': {}}
+
+    def save_player(self, player_id=1, updates=None):
+        try:
+            if updates:
+                set_clause = ', '.join(f"{k} = ?" for k in updates)
+                values = list(updates.values()) + [player_id]
+                self._execute(f'UPDATE Player SET {set_clause}, Last_Save_Date = strftime("%s","now") WHERE Player_ID = ?', values)
+            self.conn.commit()
+        except sqlite3.Error as e:
+            print(f"Save error: {e}")
@@ -0,0 +1,271 @@
+import numpy as np
+
+# Corner signs in the same order as collision_utils.get_square_vertices
+SQUARE_CORNERS = ((-1, -1), (1, -1), (1, 1), (-1, 1))
+BVH_LEAF_SIZE = 4  # Max sub-shapes per bounding-volume tree leaf
+
+
+def _bounding_circle(centers, radii):
+    """ Circle around the AABB midpoint of a set of circles that encloses all of them. """
+    lo = (centers - radii[:, None]).min(axis=0)
+    hi = (centers + radii[:, None]).max(axis=0)
+    mid = (lo + hi) / 2
+    return mid, float((np.hypot(*(centers - mid).T) + radii).max())
+
+
+class CompiledHitbox:
+    """ A hitbox's local shapes packed into read-only arrays.
+
+    Built once per hitbox definition and safe to share between entities.
+    Squares keep their half extents, circles their radius; the other field is 0.
+
+    Compilation also computes bounds for early rejection in the narrow phase:
+    a local AABB of the whole hitbox, and a small bounding-circle tree over the
+    sub-shapes (node 0 is the root and bounds everything). Shapes are reordered
+    so every leaf covers a contiguous run of them.
+    """
+
+    def __init__(self, local_shapes: list[dict]):
+        shapes = [s for s in local_shapes if s.get('type') in ('square', 'circle')]
+        shapes = self._build_tree(shapes)
+        self.local_shapes = shapes
+        self.count = len(shapes)
+        self.is_circle = np.array([s['type'] == 'circle' for s in shapes], dtype=np.bool_)
+        self.offsets = np.array([(s.get('local_x', 0.0), s.get('local_y', 0.0)) for s in shapes],
+                                dtype=np.float64).reshape(-1, 2)
+        self.half_extents = np.array([(s.get('width', 0.0) / 2, s.get('height', 0.0) / 2) for s in shapes],
+                                     dtype=np.float64).reshape(-1, 2)
+        self.radii = np.array([s.get('radius', 0.0) for s in shapes], dtype=np.float64)
+        self.local_angles = np.radians(np.array([s.get('local_angle_degrees', 0.0) for s in shapes],
+                                                dtype=np.float64))
+        self._compute_aabb()
+        for arr in (self.is_circle, self.offsets, self.half_extents, self.radii, self.local_angles,
+                    self.node_centers, self.node_radii, self.node_left, self.node_right,
+                    self.node_start, self.node_count, self.aabb_center, self.aabb_half):
+            arr.flags.writeable = False
+
+    def _build_tree(self, shapes):
+        """ Builds the bounding-circle tree and returns shapes in leaf order. """
+        centers = np.array([(s.get('local_x', 0.0), s.get('local_y', 0.0)) for s in shapes],
+                           dtype=np.float64).reshape(-1, 2)
+        # Rotation-invariant bound of each shape about its own centre
+        radii = np.array([s['radius'] if s['type'] == 'circle' else
+                          np.hypot(s.get('width', 0.0) / 2, s.get('height', 0.0) / 2) for s in shapes],
+                         dtype=np.float64)
+        order, nodes = [], []  # nodes: [center, radius, left, right, start, count]
+
+        def build(indices):
+            node = len(nodes)
+            mid, radius = _bounding_circle(centers[indices], radii[indices])
+            nodes.append([mid, radius, -1, -1, len(order), len(indices)])
+            if len(indices) <= BVH_LEAF_SIZE:
+                order.extend(indices.tolist())
+                return node
+            # Split at the median along the longer spread of shape centres
+            spread = np.ptp(centers[indices], axis=0)
+            axis = int(spread[1] > spread[0])
+            indices = indices[np.argsort(centers[indices, axis], kind='stable')]
+            half = len(indices) // 2
+            nodes[node][2] = build(indices[:half])
+            nodes[node][3] = build(indices[half:])
+            return node
+
+        if shapes:
+            build(np.arange(len(shapes)))
+        self.node_count_total = len(nodes)
+        self.node_centers = np.array([n[0] for n in nodes], dtype=np.float64).reshape(-1, 2)
+        self.node_radii = np.array([n[1] for n in nodes], dtype=np.float64)
+        self.node_left = np.array([n[2] for n in nodes], dtype=np.intp)
+        self.node_right = np.array([n[3] for n in nodes], dtype=np.intp)
+        self.node_start = np.array([n[4] for n in nodes], dtype=np.intp)
+        self.node_count = np.array([n[5] for n in nodes], dtype=np.intp)
+        return [shapes[i] for i in order]
+
+    def _compute_aabb(self):
+        """ Local AABB of the whole hitbox, as centre and half extents. """
+        if self.count == 0:
+            self.aabb_center = np.zeros(2)
+            self.aabb_half = np.zeros(2)
+            return
+        c, s = np.abs(np.cos(self.local_angles)), np.abs(np.sin(self.local_angles))
+        hw, hh = self.half_extents[:, 0], self.half_extents[:, 1]
+        reach = np.where(self.is_circle[:, None], self.radii[:, None],
+                         np.stack([c * hw + s * hh, s * hw + c * hh], axis=1))
+        lo = (self.offsets - reach).min(axis=0)
+        hi = (self.offsets + reach).max(axis=0)
+        self.aabb_center = (lo + hi) / 2
+        self.aabb_half = (hi - lo) / 2
+
+
+class HitboxBuffers:
+    """ World-space shapes of every active hitbox (culled ones included), laid out as flat arrays.
+
+    Rows are grouped per entity: entities[i] owns shape rows
+    spans[i][0] .. spans[i][0] + spans[i][1]. Static data (offsets, extents,
+    radii, shape kinds) is only re-gathered when the set of hitbox entities
+    changes; transform() writes the per-frame results into preallocated arrays.
+    """
+
+    def __init__(self, capacity=256):
+        self.entities = []  # row: eid
+        self.entity_row = {}  # eid: row
+        self.spans = []  # row: (first shape, shape count)
+        self.shape_start = np.zeros(0, dtype=np.intp)  # spans as arrays, for batched lookups
+        self.shape_count = np.zeros(0, dtype=np.intp)
+        self._set_nodes([])
+        self.member_set = set()
+        self.size = 0  # Number of shape rows in use
+        # Owner positions from the last transform(), in entity row order
+        self.pos_x = np.zeros(0)
+        self.pos_y = np.zeros(0)
+        self.capacity = 0
+        self._allocate(capacity)
+
+    def _allocate(self, capacity):
+        self.capacity = capacity
+        self.owner = np.zeros(capacity, dtype=np.intp)
+        self.offsets = np.zeros((capacity, 2))
+        self.local_angles = np.zeros(capacity)
+        self.half_extents = np.zeros((capacity, 2))
+        self.radii = np.zeros(capacity)
+        self.is_circle = np.zeros(capacity, dtype=np.bool_)
+        # Per-frame outputs
+        self.centers = np.zeros((capacity, 2))
+        self.angles = np.zeros(capacity)  # World angle in radians
+        self.axes = np.zeros((capacity, 2))  # cos, sin of the world angle
+        self.vertices = np.zeros((capacity, 4, 2))
+        self._scratch = np.zeros((6, capacity))
+
+    def _set_nodes(self, compiled_hitboxes):
+        """ Concatenates the bounding trees, rebasing child and shape indices to global rows. """
+        node_counts = np.array([c.node_count_total for c in compiled_hitboxes], dtype=np.intp)
+        node_base = np.cumsum(node_counts) - node_counts
+        self.node_root = np.where(node_counts > 0, node_base, -1)  # Per entity row
+        self.node_owner = np.repeat(np.arange(len(node_counts)), node_counts)
+        def cat(name, dtype, shape=()):
+            parts = [getattr(c, name) for c in compiled_hitboxes]
+            return np.concatenate(parts) if parts else np.zeros((0,) + shape, dtype=dtype)
+        self.node_offsets = cat('node_centers', np.float64, (2,))
+        self.node_radii = cat('node_radii', np.float64)
+        base = node_base[self.node_owner]
+        left, right = cat('node_left', np.intp), cat('node_right', np.intp)
+        self.node_left = np.where(left >= 0, left + base, -1)
+        self.node_right = np.where(right >= 0, right + base, -1)
+        self.node_start = cat('node_start', np.intp) + self.shape_start[self.node_owner]
+        self.node_count = cat('node_count', np.intp)
+        self.aabb_local_center = cat('aabb_center', np.float64, (2,)).reshape(-1, 2)
+        self.aabb_local_half = cat('aabb_half', np.float64, (2,)).reshape(-1, 2)
+        # Per-frame outputs
+        self.node_centers = np.zeros_like(self.node_offsets)
+        self.aabb_center = np.zeros_like(self.aabb_local_center)  # World AABB per entity row
+        self.aabb_half = np.zeros_like(self.aabb_local_half)
+        self._node_scratch = np.zeros((3, len(self.node_owner)))
+
+    def rebuild(self, entities, compiled_hitboxes):
+        """ Lays out the static shape data for a new set of hitbox entities. """
+        self.entities = list(entities)
+        self.entity_row = {eid: row for row, eid in enumerate(self.entities)}
+        self.member_set = set(entities)
+        counts = [compiled.count for compiled in compiled_hitboxes]
+        total = sum(counts)
+        if total > self.capacity:
+            capacity = self.capacity
+            while capacity < total:
+                capacity *= 2
+            self._allocate(capacity)
+        self.size = total
+        self.spans = []
+        start = 0
+        for count in counts:
+            self.spans.append((start, count))
+            start += count
+        self.shape_count = np.array(counts, dtype=np.intp)
+        self.shape_start = np.cumsum(self.shape_count) - self.shape_count
+        self._set_nodes(compiled_hitboxes)
+        if total == 0:
+            return
+        self.owner[:total] = np.repeat(np.arange(len(counts)), counts)
+        np.concatenate([c.offsets for c in compiled_hitboxes], out=self.offsets[:total])
+        np.concatenate([c.local_angles for c in compiled_hitboxes], out=self.local_angles[:total])
+        np.concatenate([c.half_extents for c in compiled_hitboxes], out=self.half_extents[:total])
+        np.concatenate([c.radii for c in compiled_hitboxes], out=self.radii[:total])
+        np.concatenate([c.is_circle for c in compiled_hitboxes], out=self.is_circle[:total])
+
+    def transform(self, pos_x, pos_y, angles):
+        """ Rotates and translates every shape by its owner's pose in one batched pass.
+
+        pos_x, pos_y and angles (radians) are per-entity arrays in row order.
+        """
+        self.pos_x = pos_x
+        self.pos_y = pos_y
+        n = self.size
+        if n == 0:
+            return
+        self._transform_bounds(pos_x, pos_y, angles)
+        owner = self.owner[:n]
+        c, s, t1, t2, t3, t4 = (row[:n] for row in self._scratch)
+        ang = self.angles[:n]
+        np.take(angles, owner, out=ang)
+        np.cos(ang, out=c)
+        np.sin(ang, out=s)
+
+        # Shape centre: owner position + owner rotation applied to the local offset
+        ox, oy = self.offsets[:n, 0], self.offsets[:n, 1]
+        cx, cy = self.centers[:n, 0], self.centers[:n, 1]
+        np.take(pos_x, owner, out=cx)
+        np.multiply(ox, c, out=t1)
+        cx += t1
+        np.multiply(oy, s, out=t1)
+        cx -= t1
+        np.take(pos_y, owner, out=cy)
+        np.multiply(ox, s, out=t1)
+        cy += t1
+        np.multiply(oy, c, out=t1)
+        cy += t1
+
+        # Shape axes use the owner angle plus the shape's own local angle
+        ang += self.local_angles[:n]
+        cos_w, sin_w = self.axes[:n, 0], self.axes[:n, 1]
+        np.cos(ang, out=cos_w)
+        np.sin(ang, out=sin_w)
+
+        hw, hh = self.half_extents[:n, 0], self.half_extents[:n, 1]
+        np.multiply(hw, cos_w, out=t1)  # x extent along x
+        np.multiply(hh, sin_w, out=t2)  # y extent along x
+        np.multiply(hw, sin_w, out=t3)  # x extent along y
+        np.multiply(hh, cos_w, out=t4)  # y extent along y
+        verts = self.vertices
+        for k, (sx, sy) in enumerate(SQUARE_CORNERS):
+            vx, vy = verts[:n, k, 0], verts[:n, k, 1]
+            (np.add if sx > 0 else np.subtract)(cx, t1, out=vx)
+            (np.subtract if sy > 0 else np.add)(vx, t2, out=vx)
+            (np.add if sx > 0 else np.subtract)(cy, t3, out=vy)
+            (np.add if sy > 0 else np.subtract)(vy, t4, out=vy)
+
+    def _transform_bounds(self, pos_x, pos_y, angles):
+        """ Places the bounding trees and whole-hitbox AABBs for this frame. """
+        c, s = np.cos(angles), np.sin(angles)
+        lx, ly = self.aabb_local_center[:, 0], self.aabb_local_center[:, 1]
+        self.aabb_center[:, 0] = pos_x + lx * c - ly * s
+        self.aabb_center[:, 1] = pos_y + lx * s + ly * c
+        ac, as_ = np.abs(c), np.abs(s)
+        hx, hy = self.aabb_local_half[:, 0], self.aabb_local_half[:, 1]
+        self.aabb_half[:, 0] = ac * hx + as_ * hy
+        self.aabb_half[:, 1] = as_ * hx + ac * hy
+
+        owner = self.node_owner
+        nc, ns, t = self._node_scratch
+        np.take(c, owner, out=nc)
+        np.take(s, owner, out=ns)
+        ox, oy = self.node_offsets[:, 0], self.node_offsets[:, 1]
+        cx, cy = self.node_centers[:, 0], self.node_centers[:, 1]
+        np.take(pos_x, owner, out=cx)
+        np.multiply(ox, nc, out=t)
+        cx += t
+        np.multiply(oy, ns, out=t)
+        cx -= t
+        np.take(pos_y, owner, out=cy)
+        np.multiply(ox, ns, out=t)
+        cy += t
+        np.multiply(oy, nc, out=t)
+        cy += t
@@ -0,0 +1,255 @@
+import hashlib
+import mmap
+import struct
+from .gamedb import make_weapon_data
+
+# Compiled level pack written by level_packer.py. Little-endian, 8-byte aligned:
+#   header:    magic, version, level, table count, SHA-256 of the sources (see source_digest)
+#   directory: per table a 16-byte name and the table's byte offset
+#   strings:   count, u64 offsets[count + 1], utf-8 blob (the '__strings__' table)
+#   table:     column count, row count, per column (name string id, type),
+#              then per column a null mask (one byte per row) and 8-byte values
+# Columns are int64, float64 or string ids, so the reader exposes them as
+# memoryviews straight over the mapped file without parsing anything.
+PACK_MAGIC = b'SVLP'
+PACK_VERSION = 4
+HEADER = struct.Struct('<4sHHI32s')
+DIRECTORY_ENTRY = struct.Struct('<16sQ')
+TABLE_HEADER = struct.Struct('<II')
+COLUMN = struct.Struct('<IB3x')
+COUNT = struct.Struct('<Q')
+STRINGS = '__strings__'
+INT, FLOAT, STRING = range(3)
+FORMATS = {INT: 'q', FLOAT: 'd', STRING: 'q'}
+
+
+def _pad_length(length):
+    return -length % 8
+
+
+def _pad(length):
+    return b'\0' * _pad_length(length)
+
+
+def _column_type(table, column, values):
+    present = [v for v in values if v is not None]
+    if any(isinstance(v, str) for v in present):
+        if not all(isinstance(v, str) for v in present):
+            # Interning the numbers as strings would hand back '3' for 3
+            raise ValueError(f"Column {table}.{column} mixes strings and numbers")
+        return STRING
+    if any(isinstance(v, float) for v in present):
+        return FLOAT
+    return INT
+
+
+def source_digest(db, hitbox_paths):
+    """ Fingerprint of what a pack is built from: GameDB's definition tables and the hitbox files.
+
+    Returns None if the DB can't be read, which never matches a pack.
+    """
+    db_digest = db.source_digest()
+    if db_digest is None:
+        return None
+    digest = hashlib.sha256(db_digest)
+    for path in sorted(hitbox_paths):
+        digest.update(path.encode('utf-8'))
+        try:
+            with open(path, 'rb') as f:
+                digest.update(f.read())
+        except OSError:
+            digest.update(b'\0')
+    return digest.digest()
+
+
+def write_pack(path, level, tables, digest=bytes(32)):
+    """ Writes tables ({name: list of row dicts}) as a level pack stamped with digest (see source_digest).
+
+    Raises ValueError if a column mixes strings and numbers.
+    """
+    strings = {}
+
+    def string_id(text):
+        if text not in strings:
+            strings[text] = len(strings)
+        return strings[text]
+
+    encoded = {}
+    for name, rows in tables.items():
+        columns = []
+        for row in rows:
+            for key in row:
+                if key not in columns:
+                    columns.append(key)
+        parts = [TABLE_HEADER.pack(len(columns), len(rows))]
+        data = []
+        for column in columns:
+            values = [row.get(column) for row in rows]
+            kind = _column_type(name, column, values)
+            parts.append(COLUMN.pack(string_id(column), kind))
+            nulls = bytes(1 if v is None else 0 for v in values)
+            if kind == STRING:
+                values = [0 if v is None else string_id(v) for v in values]
+            elif kind == FLOAT:
+                values = [0.0 if v is None else float(v) for v in values]
+            else:
+                values = [0 if v is None else int(v) for v in values]
+            data.append(nulls + _pad(len(nulls)))
+            data.append(struct.pack(f'<{len(values)}{FORMATS[kind]}', *values))
+        encoded[name] = b''.join(parts + data)
+
+    blob = b''.join(text.encode('utf-8') for text in strings)
+    offsets = [0]
+    for text in strings:
+        offsets.append(offsets[-1] + len(text.encode('utf-8')))
+    encoded = {STRINGS: COUNT.pack(len(strings)) + struct.pack(f'<{len(offsets)}Q', *offsets) + blob, **encoded}
+
+    offset = HEADER.size + _pad_length(HEADER.size) + DIRECTORY_ENTRY.size * len(encoded)
+    directory, body = [], []
+    for name, section in encoded.items():
+        directory.append(DIRECTORY_ENTRY.pack(name.encode('ascii'), offset))
+        body.append(section + _pad(len(section)))
+        offset += len(body[-1])
+    with open(path, 'wb') as f:
+        f.write(HEADER.pack(PACK_MAGIC, PACK_VERSION, level, len(encoded), digest) + _pad(HEADER.size))
+        f.write(b''.join(directory))
+        f.write(b''.join(body))
+
+
+class PackTable:
+    """ One table of a pack; columns are zero-copy views over the mapped file. """
+
+    def __init__(self, pack, offset):
+        self.pack = pack
+        buffer = pack.buffer
+        column_count, self.row_count = TABLE_HEADER.unpack_from(buffer, offset)
+        offset += TABLE_HEADER.size
+        described = []
+        for _ in range(column_count):
+            name_id, kind = COLUMN.unpack_from(buffer, offset)
+            described.append((pack.string(name_id), kind))
+            offset += COLUMN.size
+        self.columns = {}  # name: (type, null mask, values)
+        rows = self.row_count
+        for name, kind in described:
+            nulls = buffer[offset:offset + rows]
+            offset += rows + _pad_length(rows)
+            values = buffer[offset:offset + rows * 8].cast(FORMATS[kind])
+            offset += rows * 8
+            self.columns[name] = (kind, nulls, values)
+
+    def __len__(self):
+        return self.row_count
+
+    def column(self, name):
+        """ Raw int64/float64 (or string id) values of a column, nulls read as 0. """
+        return self.columns[name][2]
+
+    def rows(self, drop_nulls=False):
+        """ Materializes the table as row dicts, as sqlite3.Row -> dict would give. """
+        string = self.pack.string
+        result = [{} for _ in range(self.row_count)]
+        for name, (kind, nulls, values) in self.columns.items():
+            for i, row in enumerate(result):
+                if nulls[i]:
+                    if not drop_nulls:
+                        row[name] = None
+                elif kind == STRING:
+                    row[name] = string(values[i])
+                else:
+                    row[name] = values[i]
+        return result
+
+
+class LevelPack:
+    """ A memory-mapped level pack.
+
+    The pack holds definitions only: level data plus every ship, weapon and mob
+    keyed by ID. player_data(save) resolves the save's current ship and weapon
+    from them and level_data() returns the same structures as GameDB.load_player()
+    and GameDB.load_level(); hitboxes() returns the packed hitbox shapes by file
+    path. source_digest is compared against levelpack.source_digest() to tell
+    whether the pack is still in sync with the DB and hitboxes.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        with open(path, 'rb') as f:
+            self._map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        self.buffer = memoryview(self._map)
+        magic, version, self.level, table_count, self.source_digest = HEADER.unpack_from(self.buffer, 0)
+        if magic != PACK_MAGIC or version != PACK_VERSION:
+            raise ValueError(f"{path} is not a version {PACK_VERSION} level pack")
+        offset = HEADER.size + _pad_length(HEADER.size)
+        self.offsets = {}
+        for _ in range(table_count):
+            name, table_offset = DIRECTORY_ENTRY.unpack_from(self.buffer, offset)
+            self.offsets[name.rstrip(b'\0').decode('ascii')] = table_offset
+            offset += DIRECTORY_ENTRY.size
+        strings_offset = self.offsets[STRINGS]
+        (count,) = COUNT.unpack_from(self.buffer, strings_offset)
+        start = strings_offset + COUNT.size
+        self._string_offsets = self.buffer[start:start + (count + 1) * 8].cast('Q')
+        self._blob = start + (count + 1) * 8
+        self._strings = {}
+        self._tables = {}
+
+    def string(self, string_id):
+        text = self._strings.get(string_id)
+        if text is None:
+            begin = self._blob + self._string_offsets[string_id]
+            end = self._blob + self._string_offsets[string_id + 1]
+            text = self._strings[string_id] = str(self.buffer[begin:end], 'utf-8')
+        return text
+
+    def table(self, name):
+        table = self._tables.get(name)
+        if table is None:
+            table = self._tables[name] = PackTable(self, self.offsets[name])
+        return table
+
+    def player_data(self, save):
+        """ Resolves a save (its Player row) against the packed ship, weapon and mob definitions.
+
+        Returns {'ship_data', 'weapon_data', 'mob_data'} as GameDB.load_player does, or
+        None if the save's ship or any mob is missing so the caller can use the DB.
+        """
+        ships = {ship['Ship_ID']: ship for ship in self.table('ships').rows()}
+        ship_data = ships.get(save['Current_Ship_ID'])
+        mobs = self.table('mobs').rows()
+        if ship_data is None or not mobs:
+            return None
+        weapon_id = save['Current_Weapon_ID']
+        weapon_row = next((w for w in self.table('weapons').rows() if w['Weapon_ID'] == weapon_id), None)
+        weapon_data = {}
+        if weapon_row is None:
+            print(f"No weapon data for ID {weapon_id}")
+        elif weapon_row['Projectile_Sprite_Path'] is not None:
+            placements = [(p['local_x'], p['local_y']) for p in self.table('placements').rows()
+                          if p['Weapon_ID'] == weapon_id and p['Sprite_Path'] == ship_data['Ship_Sprite_Path']]
+            weapon_data = make_weapon_data(weapon_row, placements)
+        return {'ship_data': ship_data, 'weapon_data': weapon_data, 'mob_data': mobs[0]}
+
+    def level_data(self):
+        flight_plans = {}
+        for waypoint in self.table('waypoints').rows():
+            flight_plans.setdefault(waypoint['Flight_Plan_ID'], []).append(waypoint)
+        formations = {}
+        for member in self.table('formations').rows():
+            formations.setdefault(member['Formation_ID'], []).append(member)
+        events = self.table('events').rows()
+        mob_ids = {event['Mob_ID'] for event in events}
+        return {
+            'events': events,
+            'flight_plans': flight_plans,
+            'flight_plan_info': {plan['Flight_Plan_ID']: plan for plan in self.table('flight_plans').rows()},
+            'formations': formations,
+            'mob_cache': {mob['Mob_ID']: mob for mob in self.table('mobs').rows() if mob['Mob_ID'] in mob_ids},
+        }
+
+    def hitboxes(self):
+        """ Returns {hitbox path: list of shape dicts} as load_hitbox_from_json would. """
+        shapes = {}
+        for shape in self.table('hitbox_shapes').rows(drop_nulls=True):
+            shapes.setdefault(shape.pop('hitbox'), []).append(shape)
+        return shapes
@@ -0,0 +1,46 @@
+from collections import OrderedDict
+import pygame
+
+
+class RotationCache:
+    """ LRU cache of rotated sprite surfaces.
+
+    Angles are quantized to `steps` evenly spaced orientations, and each
+    (atlas key, step) pair is rotated once and reused until evicted, so drawing
+    a spinning sprite costs a blit instead of a fresh pygame.transform.rotate
+    surface every frame.
+    """
+
+    def __init__(self, surfaces, steps=72, capacity=1024):
+        self.surfaces = surfaces  # atlas key: unrotated surface
+        self.steps = steps
+        self.capacity = capacity
+        self._cache = OrderedDict()  # (atlas key, step): rotated surface
+
+    def __len__(self):
+        return len(self._cache)
+
+    def step_for(self, angle):
+        return round(angle * self.steps / 360.0) % self.steps
+
+    def get(self, atlas_key, angle):
+        """ Returns the surface for atlas_key rotated to the nearest quantized angle (degrees). """
+        key = (atlas_key, self.step_for(angle))
+        surface = self._cache.get(key)
+        if surface is not None:
+            self._cache.move_to_end(key)
+            return surface
+        surface = pygame.transform.rotate(self.surfaces[atlas_key], key[1] * 360.0 / self.steps)
+        self._cache[key] = surface
+        if len(self._cache) > self.capacity:
+            self._cache.popitem(last=False)
+        return surface
+
+    def prebake(self, atlas_keys=None):
+        """ Renders every step for the given keys (all atlas keys by default) up front. """
+        for atlas_key in (self.surfaces if atlas_keys is None else atlas_keys):
+            for step in range(self.steps):
+                self.get(atlas_key, step * 360.0 / self.steps)
+
+    def clear(self):
+        self._cache.clear()
@@ -0,0 +1,85 @@
+from array import array
+
+# Half of the 8-neighbourhood, so each pair of adjacent cells is visited once
+FORWARD_NEIGHBOURS = ((1, -1), (1, 0), (1, 1), (0, 1))
+
+
+class SpatialHash:
+    """ Persistent, unbounded uniform grid used for the collision broad phase.
+
+    Entities are bucketed by the cell containing their position and stay there
+    between frames; update() only touches the buckets of an entity whose cell
+    changed. Cells are dict keys, so there are no world bounds: off-screen and
+    spawning entities are covered like any other. cell_size must be at least as
+    large as the biggest hitbox so overlapping entities share or neighbour a cell.
+    """
+
+    def __init__(self, cell_size):
+        self.cell_size = cell_size
+        self.cells = {}  # (cell_x, cell_y): list of eids
+        self.cell_of = {}  # eid: (cell_x, cell_y)
+
+    def __len__(self):
+        return len(self.cell_of)
+
+    def cell_for(self, x, y):
+        return int(x // self.cell_size), int(y // self.cell_size)
+
+    def move(self, eid, cell):
+        """ Puts eid in cell, removing it from its previous cell. """
+        old = self.cell_of.get(eid)
+        if old == cell:
+            return
+        if old is not None:
+            self._discard(eid, old)
+        self.cell_of[eid] = cell
+        bucket = self.cells.get(cell)
+        if bucket is None:
+            self.cells[cell] = [eid]
+        else:
+            bucket.append(eid)
+
+    def update(self, eid, x, y):
+        self.move(eid, self.cell_for(x, y))
+
+    def remove(self, eid):
+        cell = self.cell_of.pop(eid, None)
+        if cell is not None:
+            self._discard(eid, cell)
+
+    def _discard(self, eid, cell):
+        bucket = self.cells[cell]
+        bucket.remove(eid)
+        if not bucket:
+            del self.cells[cell]
+
+    def candidate_pairs(self, out_a=None, out_b=None):
+        """ Fills two parallel arrays with every pair sharing or neighbouring a cell.
+
+        Each pair appears once. No per-pair objects are created: ids are appended
+        to the given array('q') buffers (cleared first), which callers can reuse
+        across frames. Returns (out_a, out_b).
+        """
+        if out_a is None:
+            out_a, out_b = array('q'), array('q')
+        else:
+            del out_a[:]
+            del out_b[:]
+        append_a, append_b = out_a.append, out_b.append
+        cells = self.cells
+        for (cx, cy), members in cells.items():
+            count = len(members)
+            for i in range(count - 1):
+                e1 = members[i]
+                for j in range(i + 1, count):
+                    append_a(e1)
+                    append_b(members[j])
+            for ox, oy in FORWARD_NEIGHBOURS:
+                other = cells.get((cx + ox, cy + oy))
+                if other is None:
+                    continue
+                for e1 in members:
+                    for e2 in other:
+                        append_a(e1)
+                        append_b(e2)
+        return out_a, out_b
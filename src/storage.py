@@ -0,0 +1,180 @@
+from array import array
+import numpy as np
+from .components import Position, Velocity, Acceleration, Rotation, Health, Damage
+
+# Components packed into columns, and the numeric fields each one keeps.
+# Every field is stored as a C double ('d') so columns can be viewed as
+# float64 arrays without copying.
+COLUMN_LAYOUT = {
+    Position: ('x', 'y'),
+    Velocity: ('dx', 'dy', 'max_speed'),
+    Acceleration: ('ax', 'ay'),
+    Rotation: ('angle', 'speed'),
+    Health: ('max_hp', 'current_hp'),
+    Damage: ('amount',),
+}
+
+INITIAL_CAPACITY = 1024
+
+
+def _column_property(index):
+    def fget(self):
+        return self._cols[index][self._slot]
+
+    def fset(self, value):
+        self._cols[index][self._slot] = value
+
+    return property(fget, fset)
+
+
+def _make_view_class(component_type, fields):
+    """ Builds a subclass of component_type whose fields read and write a column slot. """
+    namespace = {'__slots__': ('_cols', '_slot'), 'component_type': component_type}
+    for index, field in enumerate(fields):
+        namespace[field] = _column_property(index)
+    return type(f"{component_type.__name__}View", (component_type,), namespace)
+
+
+class ColumnStore:
+    """ Struct-of-arrays storage for the hot numeric components.
+
+    Each entity that holds at least one columnar component owns a dense slot.
+    Every field of every columnar component is an array('d') indexed by that
+    slot, and a per-type presence mask (array('b')) records which slots hold the
+    component. World.get() keeps returning component objects: they are views
+    whose attributes read and write the columns, so existing code is unaffected
+    while batched systems can work on whole columns at once.
+    """
+
+    def __init__(self, layout=None, capacity=INITIAL_CAPACITY):
+        self.layout = layout or COLUMN_LAYOUT
+        self.capacity = capacity
+        self.slot_of = {}  # eid: slot
+        self.entity_at = array('q', [-1]) * capacity  # slot: eid (-1 when free)
+        self.free_slots = []
+        self.next_slot = 0
+        self.columns = {}  # type: tuple of arrays, ordered as in layout
+        self.present = {}  # type: presence mask
+        self.live = array('b', [0]) * capacity  # Mirrors World.live_entities per slot
+        self.view_classes = {}  # view type: component type
+        self._views = {}  # component type: view type
+        for component_type, fields in self.layout.items():
+            self.columns[component_type] = tuple(array('d', [0.0]) * capacity for _ in fields)
+            self.present[component_type] = array('b', [0]) * capacity
+            view_cls = _make_view_class(component_type, fields)
+            self._views[component_type] = view_cls
+            self.view_classes[view_cls] = component_type
+
+    def column(self, component_type, field):
+        """ Returns the array backing one field of a columnar component. """
+        return self.columns[component_type][self.layout[component_type].index(field)]
+
+    def mask(self, component_type):
+        return self.present[component_type]
+
+    @property
+    def size(self):
+        """ Number of slots in use, i.e. the length worth scanning in a batched pass. """
+        return self.next_slot
+
+    def _grow(self):
+        extra = self.capacity
+        self.capacity += extra
+        # Extend in place so views and callers holding column references stay valid
+        for component_type, cols in self.columns.items():
+            for col in cols:
+                col.extend(array('d', [0.0]) * extra)
+            self.present[component_type].extend(array('b', [0]) * extra)
+        self.live.extend(array('b', [0]) * extra)
+        self.entity_at.extend(array('q', [-1]) * extra)
+
+    def _alloc(self, eid):
+        if self.free_slots:
+            slot = self.free_slots.pop()
+        else:
+            if self.next_slot >= self.capacity:
+                self._grow()
+            slot = self.next_slot
+            self.next_slot += 1
+        self.slot_of[eid] = slot
+        self.entity_at[slot] = eid
+        return slot
+
+    def attach(self, eid, component):
+        """ Copies a component into the columns and returns (component type, stored object).
+
+        Non-columnar components are passed through unchanged.
+        """
+        component_type = type(component)
+        component_type = self.view_classes.get(component_type, component_type)
+        view_cls = self._views.get(component_type)
+        if view_cls is None:
+            return component_type, component
+        slot = self.slot_of.get(eid)
+        if slot is None:
+            slot = self._alloc(eid)
+        cols = self.columns[component_type]
+        values = [getattr(component, field) for field in self.layout[component_type]]
+        for col, value in zip(cols, values):
+            col[slot] = value
+        self.present[component_type][slot] = 1
+        view = object.__new__(view_cls)
+        view._cols = cols
+        view._slot = slot
+        return component_type, view
+
+    def set_live(self, eid, live):
+        slot = self.slot_of.get(eid)
+        if slot is not None:
+            self.live[slot] = 1 if live else 0
+
+    def detach(self, eid, component_type):
+        slot = self.slot_of.get(eid)
+        if slot is not None and component_type in self.present:
+            self.present[component_type][slot] = 0
+
+    def release(self, eid):
+        """ Frees the entity's slot; existing views for it must no longer be used. """
+        slot = self.slot_of.pop(eid, None)
+        if slot is None:
+            return
+        for mask in self.present.values():
+            mask[slot] = 0
+        self.live[slot] = 0
+        self.entity_at[slot] = -1
+        self.free_slots.append(slot)
+
+
+class PositionHistory:
+    """ Position columns as they were before the latest simulation tick.
+
+    World.update captures it before running the systems, so a renderer can
+    blend between the previous and current tick. A slot is only blended if it
+    was live and held the same entity at capture time; anything that spawned,
+    was recycled or was reactivated during the tick is drawn where it is now.
+    """
+
+    def __init__(self, store):
+        self.store = store
+        self.x = np.zeros(0)
+        self.y = np.zeros(0)
+        self.valid = np.zeros(0, dtype=bool)
+        self.entity_at = np.zeros(0, dtype=np.int64)
+
+    def capture(self):
+        store = self.store
+        n = store.size
+        self.x = np.array(np.frombuffer(store.column(Position, 'x'), count=n))
+        self.y = np.array(np.frombuffer(store.column(Position, 'y'), count=n))
+        self.valid = np.frombuffer(store.live, dtype=np.int8, count=n) != 0
+        self.valid &= np.frombuffer(store.mask(Position), dtype=np.int8, count=n) != 0
+        self.entity_at = np.array(np.frombuffer(store.entity_at, dtype=np.int64, count=n))
+
+    def blend(self, entity, x, y, alpha):
+        """ Returns (x, y) interpolated from the captured position toward the current one. """
+        slot = self.store.slot_of.get(entity)
+        if slot is None or slot >= len(self.valid) or not self.valid[slot] or self.entity_at[slot] != entity:
+            return x, y
+        px = self.x[slot]
+        py = self.y[slot]
+        return px + (x - px) * alpha, py + (y - py) * alpha
@@ -1,22 +1,25 @@
 import pygame
-import math # Added for HitboxUpdateSystem
-from .components import Position, Velocity, Sprite, Rotation, Acceleration, Hitbox, PlayerWeapon, Projectile, Health, Damage, FlightPlan, LevelManager, IsActive, IsVisible, AtlasReference
+import numpy as np
+from .components import Position, Velocity, Sprite, Rotation, Acceleration, Hitbox, PlayerWeapon, Projectile, Health, Damage, FlightPlan, Formation, FormationMember, LevelManager, IsVisible, AtlasReference, CollisionLayer
 from . import config as cfg
 from . import collision_utils # Added for collision utilities
-from .hitbox_loader import load_hitbox_from_json
-import time  # For timing diagnostics
+from .hitbox_batch import CompiledHitbox
+from .spatial_hash import SpatialHash
+from .rotation_cache import RotationCache
+from .events import CollisionEvent, DamageEvent, DespawnEvent, LevelEvent
+from array import array
 
 class InputSystem:
-    def __init__(self, world, player_eid):
+    def __init__(self, world, player_eid, key_source=None):
         self.world = world
         self.player_eid = player_eid
         self.space_pressed = False
+        # Callable returning key state indexable by pygame key codes (live keyboard by default)
+        self.key_source = key_source or pygame.key.get_pressed
     
     def process(self, dt=0):
-        keys = pygame.key.get_pressed()
-        active = self.world.get(self.player_eid, IsActive)
-        visible = self.world.get(self.player_eid, IsVisible)
-        if active and not active.active or visible and not visible.visible:
+        keys = self.key_source()
+        if self.player_eid not in self.world.live_entities:
             return
         acceleration = self.world.get(self.player_eid, Acceleration)
         
@@ -40,10 +43,9 @@ class InputSystem:
                 weapon = self.world.get(self.player_eid, PlayerWeapon)
                 pos = self.world.get(self.player_eid, Position)
                 if weapon and pos:
-                    for px, py in weapon.placements:
-                        bullet_eid = self.world.pool_manager.get('bullet')
-                        if bullet_eid is None:
-                            continue  # Pool empty, skip
+                    # One acquire per volley; the pool grows (or reports exhaustion) as configured
+                    volley = self.world.pool_manager.get_many('bullet', len(weapon.placements))
+                    for (px, py), bullet_eid in zip(weapon.placements, volley):
                         bullet_pos = self.world.get(bullet_eid, Position)
                         bullet_pos.x = pos.x + px
                         bullet_pos.y = pos.y + py
@@ -52,32 +54,86 @@ class InputSystem:
                         bullet_vel.dy = -weapon.speed
                         bullet_damage = self.world.get(bullet_eid, Damage)
                         bullet_damage.amount = weapon.damage
-                        # Activate
-                        active = self.world.get(bullet_eid, IsActive)
-                        active.active = True
+                        if weapon.bullet_sprite_path in self.world.atlas:
+                            self.world.get(bullet_eid, AtlasReference).atlas_key = weapon.bullet_sprite_path
                         bullet_sprite = self.world.get(bullet_eid, Sprite)
-                        bullet_surface = pygame.image.load(weapon.bullet_sprite_path)
-                        bullet_sprite.surface = bullet_surface
-                        bullet_hitbox_data = load_hitbox_from_json(weapon.bullet_hitbox_path)
-                        if bullet_hitbox_data:
-                            self.world.add_component(bullet_eid, Hitbox(bullet_hitbox_data))
-                            self.world.add_component(bullet_eid, Projectile())
-                            self.world.add_component(bullet_eid, Damage(weapon.damage))
+                        if bullet_sprite:
+                            bullet_sprite.surface = self.world.assets.sprite(weapon.bullet_sprite_path)
+                        # Hitboxes are shared through the registry; a pooled bullet only
+                        # needs a new component the first time or when the weapon changes
+                        compiled = self.world.assets.hitbox(weapon.bullet_hitbox_path)
+                        bullet_hitbox = self.world.get(bullet_eid, Hitbox)
+                        if bullet_hitbox is None:
+                            self.world.add_component(bullet_eid, Hitbox(compiled.local_shapes, compiled))
+                        elif bullet_hitbox.compiled is not compiled:
+                            bullet_hitbox.local_shapes = compiled.local_shapes
+                            bullet_hitbox.compiled = compiled
         else:
             self.space_pressed = False
 
 class MovementSystem:
-    def __init__(self, world):
+    def __init__(self, world, vectorized=None):
         self.world = world
+        if vectorized is None:
+            vectorized = cfg.VECTORIZED_MOVEMENT
+        # The batched path works on the column store, so it needs a columnar World
+        self.vectorized = vectorized and world.store is not None
     
     def process(self, dt):
-        for entity in self.world.entities:
-            active = self.world.get(entity, IsActive)
-            visible = self.world.get(entity, IsVisible)
-            if active and not active.active:
-                continue
-            if visible and not visible.visible:
-                continue
+        if self.vectorized:
+            self._process_vectorized(dt)
+        else:
+            self._process_scalar(dt)
+
+    def _process_vectorized(self, dt):
+        """ Same integration as _process_scalar, done on whole columns at once. """
+        store = self.world.store
+        n = store.size
+        if n == 0:
+            return
+        def col(component_type, field):
+            return np.frombuffer(store.column(component_type, field), dtype=np.float64, count=n)
+        def mask(component_type):
+            return np.frombuffer(store.mask(component_type), dtype=np.int8, count=n).view(np.bool_)
+
+        live = np.frombuffer(store.live, dtype=np.int8, count=n).view(np.bool_)
+        moving = np.flatnonzero(live & mask(Position) & mask(Velocity))
+        if moving.size == 0:
+            return
+        x, y = col(Position, 'x'), col(Position, 'y')
+        dx, dy = col(Velocity, 'dx'), col(Velocity, 'dy')
+
+        accelerating = moving[mask(Acceleration)[moving]]
+        if accelerating.size:
+            ax = col(Acceleration, 'ax')[accelerating]
+            ay = col(Acceleration, 'ay')[accelerating]
+            vx = dx[accelerating] + ax * dt
+            vy = dy[accelerating] + ay * dt
+
+            # Damp axes with no input and snap slow drift to a stop
+            damping = 1 - cfg.PLAYER_DAMPING_FACTOR * dt
+            idle_x = ax == 0
+            vx[idle_x] *= damping
+            vx[idle_x & (np.abs(vx) < 1)] = 0.0
+            idle_y = ay == 0
+            vy[idle_y] *= damping
+            vy[idle_y & (np.abs(vy) < 1)] = 0.0
+
+            max_speed = col(Velocity, 'max_speed')[accelerating]
+            speed_sq = vx * vx + vy * vy
+            too_fast = speed_sq > max_speed * max_speed
+            if too_fast.any():
+                scale = max_speed[too_fast] / np.sqrt(speed_sq[too_fast])
+                vx[too_fast] *= scale
+                vy[too_fast] *= scale
+            dx[accelerating] = vx
+            dy[accelerating] = vy
+
+        x[moving] += dx[moving] * dt
+        y[moving] += dy[moving] * dt
+
+    def _process_scalar(self, dt):
+        for entity in self.world.query_live(Position, Velocity):
             velocity = self.world.get(entity, Velocity)
             position = self.world.get(entity, Position)
             acceleration = self.world.get(entity, Acceleration)
@@ -109,13 +165,7 @@ class RotationSystem:
         self.world = world
 
     def process(self, dt):
-        for entity in self.world.entities:
-            active = self.world.get(entity, IsActive)
-            visible = self.world.get(entity, IsVisible)
-            if active and not active.active:
-                continue
-            if visible and not visible.visible:
-                continue
+        for entity in self.world.query_live(Rotation):
             rotation = self.world.get(entity, Rotation)
             if rotation:
                 rotation.angle += rotation.speed * dt
@@ -129,20 +179,14 @@ class BoundarySystem:
         screen_width = cfg.SCREEN_WIDTH
         screen_height = cfg.SCREEN_HEIGHT
 
-        for entity in self.world.entities:
-            active = self.world.get(entity, IsActive)
-            visible = self.world.get(entity, IsVisible)
-            if active and not active.active:
-                continue
-            if visible and not visible.visible:
-                continue
+        for entity in self.world.query_live(Position):
             position = self.world.get(entity, Position)
             velocity = self.world.get(entity, Velocity)
             sprite_comp = self.world.get(entity, Sprite)
             projectile_tag = self.world.get(entity, Projectile)
 
-            # Skip boundary constraints for projectiles
-            if projectile_tag:
+            # Skip boundary constraints for projectiles and mobs flying their path
+            if projectile_tag or self.world.get(entity, FlightPlan) or self.world.get(entity, FormationMember):
                 continue
 
             if position and sprite_comp:
@@ -170,37 +214,69 @@ class BoundarySystem:
                 elif position.y > screen_height: position.y = screen_height
 
 class RenderSystem:
-    def __init__(self, world, screen):
+    """ Draws every live sprite as one Surface.blits batch.
+
+    With dirty_rects enabled only the regions covered by last frame's and this
+    frame's sprites are cleared and pushed to the display, instead of filling
+    and flipping the whole screen.
+    """
+
+    def __init__(self, world, screen, dirty_rects=None):
         self.world = world
         self.screen = screen
+        self.dirty_rects = cfg.RENDER_DIRTY_RECTS if dirty_rects is None else dirty_rects
+        self.background = cfg.BACKGROUND_COLOR if hasattr(cfg, 'BACKGROUND_COLOR') else (0, 0, 0)
+        self.rotation_cache = RotationCache(world.atlas, cfg.ROTATION_CACHE_STEPS, cfg.ROTATION_CACHE_SIZE)
+        if cfg.ROTATION_CACHE_PREBAKE:
+            self.rotation_cache.prebake()
+        self._blit_sequence = []
+        self._previous_rects = None  # None until a full frame has been drawn
 
     def _draw_centered(self, surface, center_pos):
         """Helper to draw a surface centered at a given position."""
         rect = surface.get_rect(center=center_pos)
         self.screen.blit(surface, rect.topleft)
-    
+
+    def _build_blit_sequence(self, alpha):
+        sequence = self._blit_sequence
+        sequence.clear()
+        world = self.world
+        atlas = world.atlas
+        rotation_cache = self.rotation_cache
+        history = world.position_history if alpha < 1.0 else None
+        for entity in world.query_live(AtlasReference, Position):
+            atlas_ref = world.get(entity, AtlasReference)
+            position = world.get(entity, Position)
+            rotation = world.get(entity, Rotation)
+            if rotation:
+                surface = rotation_cache.get(atlas_ref.atlas_key, rotation.angle)
+            else:
+                surface = atlas[atlas_ref.atlas_key]
+            x, y = position.x, position.y
+            if history is not None:
+                x, y = history.blend(entity, x, y, alpha)
+            width, height = surface.get_size()
+            sequence.append((surface, (x - width / 2, y - height / 2)))
+        return sequence
+
     def process(self, dt=0):
-        self.screen.fill(cfg.BACKGROUND_COLOR if hasattr(cfg, 'BACKGROUND_COLOR') else (0, 0, 0))
-        
-        for entity in self.world.entities:
-            active = self.world.get(entity, IsActive)
-            visible = self.world.get(entity, IsVisible)
-            if active and not active.active:
-                continue
-            if visible and not visible.visible:
-                continue
-            
-            atlas_ref = self.world.get(entity, AtlasReference)
-            position = self.world.get(entity, Position)
-            rotation = self.world.get(entity, Rotation)
-            
-            if atlas_ref and position:
-                surface_to_draw = self.world.atlas[atlas_ref.atlas_key]
-                if rotation:
-                    surface_to_draw = pygame.transform.rotate(surface_to_draw, rotation.angle)
-                self._draw_centered(surface_to_draw, (position.x, position.y))
-        
-        pygame.display.flip() 
+        self.draw()
+
+    def draw(self, alpha=1.0):
+        """ Draws a frame, placing sprites alpha of the way from their previous to current tick position. """
+        sequence = self._build_blit_sequence(alpha)
+        previous = self._previous_rects
+        if not self.dirty_rects or previous is None:
+            self.screen.fill(self.background)
+            rects = self.screen.blits(sequence, doreturn=self.dirty_rects)
+            pygame.display.flip()
+        else:
+            for rect in previous:
+                self.screen.fill(self.background, rect)
+            rects = self.screen.blits(sequence)
+            pygame.display.update(previous + rects)
+        if self.dirty_rects:
+            self._previous_rects = rects
 
 # New Hitbox Update System
 class HitboxUpdateSystem:
@@ -208,197 +284,316 @@ class HitboxUpdateSystem:
         self.world = world
 
     def process(self, dt):
-        for entity in self.world.entities:
-            active = self.world.get(entity, IsActive)
-            visible = self.world.get(entity, IsVisible)
-            if active and not active.active:
-                continue
-            if visible and not visible.visible:
-                continue
-            pos = self.world.get(entity, Position)
-            rot = self.world.get(entity, Rotation)
+        buffers = self.world.hitbox_buffers
+        entities = self.world.query_active(Position, Hitbox)
+        if entities != buffers.member_set:
+            with self.world.tracer.span('hitbox.rebuild'):
+                self._rebuild(buffers, entities)
+        if not buffers.entities:
+            return
+        with self.world.tracer.span('hitbox.transform'):
+            self._transform(buffers)
+
+    def _rebuild(self, buffers, entities):
+        compiled = []
+        for entity in entities:
             hitbox_comp = self.world.get(entity, Hitbox)
+            if hitbox_comp.compiled is None:
+                hitbox_comp.compiled = CompiledHitbox(hitbox_comp.local_shapes)
+            compiled.append(hitbox_comp.compiled)
+        buffers.rebuild(entities, compiled)
+        store = self.world.store
+        if store is not None:
+            self._slots = np.array([store.slot_of[e] for e in buffers.entities], dtype=np.intp)
+
+    def _transform(self, buffers):
+        # Gather each owner's pose, then transform every sub-shape in one pass
+        store = self.world.store
+        if store is not None:
+            n = store.size
+            slots = self._slots
+            pos_x = np.frombuffer(store.column(Position, 'x'), count=n)[slots]
+            pos_y = np.frombuffer(store.column(Position, 'y'), count=n)[slots]
+            has_rotation = np.frombuffer(store.mask(Rotation), dtype=np.int8, count=n)[slots]
+            angles = np.frombuffer(store.column(Rotation, 'angle'), count=n)[slots]
+            angles = np.radians(np.where(has_rotation, angles, 0.0))
+        else:
+            count = len(buffers.entities)
+            positions = [self.world.get(e, Position) for e in buffers.entities]
+            rotations = [self.world.get(e, Rotation) for e in buffers.entities]
+            pos_x = np.fromiter((p.x for p in positions), dtype=np.float64, count=count)
+            pos_y = np.fromiter((p.y for p in positions), dtype=np.float64, count=count)
+            angles = np.radians(np.fromiter((r.angle if r else 0.0 for r in rotations),
+                                            dtype=np.float64, count=count))
+        buffers.transform(pos_x, pos_y, angles)
 
-            if pos and hitbox_comp: # Rotation is optional for the hitbox itself, but used if present for entity
-                entity_angle_degrees = rot.angle if rot else 0.0
-                entity_angle_rad = math.radians(entity_angle_degrees)
-                cos_entity_angle = math.cos(entity_angle_rad)
-                sin_entity_angle = math.sin(entity_angle_rad)
-
-                hitbox_comp.current_world_shapes = [] # Clear previous frame's world shapes
-
-                for local_shape_def in hitbox_comp.local_shapes:
-                    # Get local offset and optional local rotation of the shape
-                    local_x = local_shape_def.get('local_x', 0.0)
-                    local_y = local_shape_def.get('local_y', 0.0)
-                    shape_local_angle_degrees = local_shape_def.get('local_angle_degrees', 0.0)
-
-                    # Step 1: Rotate the local offset by the entity's rotation
-                    rotated_offset_x = local_x * cos_entity_angle - local_y * sin_entity_angle
-                    rotated_offset_y = local_x * sin_entity_angle + local_y * cos_entity_angle
-
-                    # Step 2: Calculate the world center of the sub-shape
-                    shape_world_center_x = pos.x + rotated_offset_x
-                    shape_world_center_y = pos.y + rotated_offset_y
-
-                    # Step 3: Calculate the final world angle of the sub-shape
-                    shape_world_angle_degrees = entity_angle_degrees + shape_local_angle_degrees
-
-                    transformed_shape = {
-                        'type': local_shape_def['type'],
-                        'world_center_x': shape_world_center_x,
-                        'world_center_y': shape_world_center_y,
-                        # Store original dimensions for clarity
-                        **{k: v for k, v in local_shape_def.items() if k not in ['type', 'local_x', 'local_y', 'local_angle_degrees']}
-                    }
-
-                    if transformed_shape['type'] == 'square':
-                        transformed_shape['world_angle_degrees'] = shape_world_angle_degrees
-                        # Calculate and store world vertices for squares for easier collision checks
-                        transformed_shape['world_vertices'] = collision_utils.get_square_vertices(
-                            shape_world_center_x,
-                            shape_world_center_y,
-                            local_shape_def['width'],
-                            local_shape_def['height'],
-                            shape_world_angle_degrees
-                        )
-                    elif transformed_shape['type'] == 'circle':
-                        # Circles don't have a meaningful 'world_angle_degrees' for collision in this context
-                        # Their radius remains the same regardless of rotation
-                        pass 
-                        
-                    hitbox_comp.current_world_shapes.append(transformed_shape)
+UNKNOWN_CELL = (np.iinfo(np.int64).min, np.iinfo(np.int64).min)  # Forces a move on the next update
 
 # New Collision System (Basic Placeholder)
 class CollisionSystem:
-    def __init__(self, world):
+    def __init__(self, world, batched=None):
         self.world = world
+        if batched is None:
+            batched = cfg.BATCHED_NARROW_PHASE
+        self.batched = batched  # Batched NumPy kernels, or the scalar reference functions
         self.collision_pairs = set() # To store pairs that have collided this frame (entity1_id, entity2_id)
-
-    def process(self, dt):
-        start_time = time.perf_counter()
-        self.collision_pairs.clear()
-        
-        # Broad-phase: Build grid of entities with hitboxes
-        GRID_SIZE = 100  # Cell size
-        grid_width = (cfg.SCREEN_WIDTH // GRID_SIZE) + 1
-        grid_height = (cfg.SCREEN_HEIGHT // GRID_SIZE) + 1
-        grid = [[[] for _ in range(grid_height)] for _ in range(grid_width)]
-        entity_to_cell = {}
-        
-        for entity in list(self.world.entities):
-            active = self.world.get(entity, IsActive)
-            visible = self.world.get(entity, IsVisible)
-            if active and not active.active:
-                continue
-            if visible and not visible.visible:
-                continue
-            if self.world.get(entity, Hitbox) and self.world.get(entity, Position):
-                pos = self.world.get(entity, Position)
-                cell_x = int(pos.x // GRID_SIZE)
-                cell_y = int(pos.y // GRID_SIZE)
-                if 0 <= cell_x < grid_width and 0 <= cell_y < grid_height:
-                    grid[cell_x][cell_y].append(entity)
-                    entity_to_cell[entity] = (cell_x, cell_y)
-        
-        # Check pairs in same or adjacent cells
-        checked_pairs = set()
-        for cx in range(grid_width):
-            for cy in range(grid_height):
-                cell_entities = grid[cx][cy]
-                # Check within cell
-                for i in range(len(cell_entities)):
-                    for j in range(i + 1, len(cell_entities)):
-                        pair = tuple(sorted((cell_entities[i], cell_entities[j])))
-                        checked_pairs.add(pair)
-                # Check adjacent cells (right and below to avoid doubles)
-                for dx, dy in [(0,1), (1,0), (1,1)]:
-                    ax, ay = cx + dx, cy + dy
-                    if ax < grid_width and ay < grid_height:
-                        for e1 in cell_entities:
-                            for e2 in grid[ax][ay]:
-                                pair = tuple(sorted((e1, e2)))
-                                checked_pairs.add(pair)
-        
-        # Narrow-phase on potential pairs
-        for entity1, entity2 in checked_pairs:
-            # Check if entities still exist
-            if entity1 not in self.world.entities or entity2 not in self.world.entities:
-                continue
-            
-            hitbox1_comp = self.world.get(entity1, Hitbox)
-            hitbox2_comp = self.world.get(entity2, Hitbox)
-            
-            if not hitbox1_comp or not hitbox2_comp:
-                continue
-            
-            if not hitbox1_comp.current_world_shapes or not hitbox2_comp.current_world_shapes:
-                continue
+        self.spatial_hash = SpatialHash(cfg.COLLISION_CELL_SIZE)
+        self._tracked_entities = None  # The hitbox_buffers entity list the hash was synced against
+        self._cell_x = np.zeros(0, dtype=np.int64)  # Current cell per hitbox_buffers row
+        self._cell_y = np.zeros(0, dtype=np.int64)
+        # Per hitbox_buffers row collision layer and mask, plus an eid -> row lookup
+        self._layers = np.zeros(0, dtype=np.int64)
+        self._masks = np.zeros(0, dtype=np.int64)
+        self._row_of = np.zeros(0, dtype=np.intp)
+        self._pairs_a = array('q')
+        self._pairs_b = array('q')
+
+    def _update_broad_phase(self, buffers):
+        """ Moves entities whose cell changed since last frame, and syncs membership. """
+        entities = buffers.entities
+        spatial_hash = self.spatial_hash
+        if entities is not self._tracked_entities:
+            # Hitbox membership changed: drop departed entities, remember known cells
+            for entity in set(spatial_hash.cell_of).difference(buffers.member_set):
+                spatial_hash.remove(entity)
+            cells = np.array([spatial_hash.cell_of.get(e, UNKNOWN_CELL) for e in entities],
+                             dtype=np.int64).reshape(-1, 2)
+            self._cell_x = cells[:, 0]
+            self._cell_y = cells[:, 1]
+            self._tracked_entities = entities
+            self._update_layers(entities)
+        if not entities:
+            return
+        cell_size = spatial_hash.cell_size
+        cell_x = np.floor_divide(buffers.pos_x, cell_size).astype(np.int64)
+        cell_y = np.floor_divide(buffers.pos_y, cell_size).astype(np.int64)
+        for row in np.flatnonzero((cell_x != self._cell_x) | (cell_y != self._cell_y)).tolist():
+            spatial_hash.move(entities[row], (int(cell_x[row]), int(cell_y[row])))
+        self._cell_x = cell_x
+        self._cell_y = cell_y
+
+    def _update_layers(self, entities):
+        layers = [self.world.get(e, CollisionLayer) for e in entities]
+        self._layers = np.array([c.layer if c else cfg.COLLISION_LAYER_ALL for c in layers], dtype=np.int64)
+        self._masks = np.array([c.mask if c else cfg.COLLISION_LAYER_ALL for c in layers], dtype=np.int64)
+        self._row_of = np.full(max(entities, default=-1) + 1, -1, dtype=np.intp)
+        self._row_of[entities] = np.arange(len(entities))
+
+    def _filter_layers(self, pairs_a, pairs_b):
+        """ Drops candidate pairs whose layers and masks cannot interact. """
+        if not pairs_a:
+            return np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.int64)
+        eids_a = np.frombuffer(pairs_a, dtype=np.int64)
+        eids_b = np.frombuffer(pairs_b, dtype=np.int64)
+        rows_a = self._row_of[eids_a]
+        rows_b = self._row_of[eids_b]
+        layers, masks = self._layers, self._masks
+        keep = ((layers[rows_a] & masks[rows_b]) != 0) & ((layers[rows_b] & masks[rows_a]) != 0)
+        return eids_a[keep], eids_b[keep]
+
+    def _narrow_phase_batched(self, buffers, pairs_a, pairs_b):
+        """ Rejects whole entities, then bounding-tree subtrees, then runs the batch kernels.
+
+        Each hitbox carries a bounding-circle tree (see CompiledHitbox). Pairs whose
+        world AABBs miss are dropped first; the rest descend both trees together,
+        one vectorized level per iteration, and only shapes under overlapping
+        leaves reach the SAT kernels.
+        """
+        rows_a = self._row_of[pairs_a]
+        rows_b = self._row_of[pairs_b]
+        roots_a = buffers.node_root[rows_a]
+        roots_b = buffers.node_root[rows_b]
+        gap = np.abs(buffers.aabb_center[rows_a] - buffers.aabb_center[rows_b])
+        reach = buffers.aabb_half[rows_a] + buffers.aabb_half[rows_b]
+        pair_index = np.flatnonzero((gap <= reach).all(axis=1) & (roots_a >= 0) & (roots_b >= 0))
+        node_a, node_b = roots_a[pair_index], roots_b[pair_index]
+
+        centers, radii = buffers.node_centers, buffers.node_radii
+        left, right = buffers.node_left, buffers.node_right
+        leaf_pairs, leaf_a, leaf_b = [], [], []
+        while pair_index.size:
+            delta = centers[node_a] - centers[node_b]
+            radius_sum = radii[node_a] + radii[node_b]
+            overlap = delta[:, 0] * delta[:, 0] + delta[:, 1] * delta[:, 1] <= radius_sum * radius_sum
+            pair_index, node_a, node_b = pair_index[overlap], node_a[overlap], node_b[overlap]
+            is_leaf_a = left[node_a] < 0
+            is_leaf_b = left[node_b] < 0
+            done = is_leaf_a & is_leaf_b
+            leaf_pairs.append(pair_index[done])
+            leaf_a.append(node_a[done])
+            leaf_b.append(node_b[done])
+            # Descend into the larger internal node of each remaining pair
+            split_a = ~is_leaf_a & (is_leaf_b | (radii[node_a] >= radii[node_b]))
+            split_b = ~done & ~split_a
+            pa, na, nb = pair_index[split_a], node_a[split_a], node_b[split_a]
+            pb, ma, mb = pair_index[split_b], node_a[split_b], node_b[split_b]
+            pair_index = np.concatenate([pa, pa, pb, pb])
+            node_a = np.concatenate([left[na], right[na], ma, ma])
+            node_b = np.concatenate([nb, nb, left[mb], right[mb]])
+
+        if not leaf_pairs:
+            return []
+        leaf_pairs = np.concatenate(leaf_pairs)
+        leaf_a, leaf_b = np.concatenate(leaf_a), np.concatenate(leaf_b)
+        hit = self._test_shape_ranges(buffers,
+                                      buffers.node_start[leaf_a], buffers.node_count[leaf_a],
+                                      buffers.node_start[leaf_b], buffers.node_count[leaf_b])
+        pair_hit = np.zeros(len(pairs_a), dtype=np.bool_)
+        pair_hit[leaf_pairs[hit]] = True
+        return list(zip(pairs_a[pair_hit].tolist(), pairs_b[pair_hit].tolist()))
+
+    def _test_shape_ranges(self, buffers, start_a, count_a, start_b, count_b):
+        """ Tests every shape in range a against every shape in range b, per range pair.
+
+        Returns a boolean per range pair that is True if any shape pair collides.
+        """
+        sizes = count_a * count_b
+        total = int(sizes.sum())
+        if total == 0:
+            return np.zeros(len(sizes), dtype=np.bool_)
+        range_index = np.repeat(np.arange(len(sizes)), sizes)
+        local = np.arange(total) - (np.cumsum(sizes) - sizes)[range_index]
+        per_b = count_b[range_index]
+        i = start_a[range_index] + local // per_b
+        j = start_b[range_index] + local % per_b
+
+        centers, axes, half, radii = buffers.centers, buffers.axes, buffers.half_extents, buffers.radii
+        circle_i = buffers.is_circle[i]
+        circle_j = buffers.is_circle[j]
+        hit = np.zeros(total, dtype=np.bool_)
+        sel = np.flatnonzero(circle_i & circle_j)
+        if sel.size:
+            si, sj = i[sel], j[sel]
+            hit[sel] = collision_utils.batch_circle_circle_collision(centers[si], radii[si], centers[sj], radii[sj])
+        sel = np.flatnonzero(~circle_i & ~circle_j)
+        if sel.size:
+            si, sj = i[sel], j[sel]
+            hit[sel] = collision_utils.batch_square_square_collision(
+                centers[si], axes[si], half[si], centers[sj], axes[sj], half[sj])
+        sel = np.flatnonzero(circle_i & ~circle_j)
+        if sel.size:
+            si, sj = i[sel], j[sel]
+            hit[sel] = collision_utils.batch_circle_square_collision(
+                centers[si], radii[si], centers[sj], axes[sj], half[sj])
+        sel = np.flatnonzero(~circle_i & circle_j)
+        if sel.size:
+            si, sj = i[sel], j[sel]
+            hit[sel] = collision_utils.batch_circle_square_collision(
+                centers[sj], radii[sj], centers[si], axes[si], half[si])
+
+        range_hit = np.zeros(len(sizes), dtype=np.bool_)
+        range_hit[range_index[hit]] = True
+        return range_hit
+
+    def _narrow_phase_scalar(self, buffers, pairs_a, pairs_b):
+        """ Reference narrow phase: one collision_utils call per sub-shape pair. """
+        n = buffers.size
+        is_circle = buffers.is_circle[:n].tolist()
+        centers = buffers.centers[:n].tolist()
+        radii = buffers.radii[:n].tolist()
+        vertices = buffers.vertices[:n].tolist()
+        hits = []
+        for entity1, entity2 in zip(pairs_a.tolist(), pairs_b.tolist()):
+            start1, count1 = buffers.spans[buffers.entity_row[entity1]]
+            start2, count2 = buffers.spans[buffers.entity_row[entity2]]
             
             collided_this_pair = False
-            for shape1_world in hitbox1_comp.current_world_shapes:
+            for i in range(start1, start1 + count1):
                 if collided_this_pair: break
-                for shape2_world in hitbox2_comp.current_world_shapes:
+                for j in range(start2, start2 + count2):
                     if collided_this_pair: break
                     
-                    type1 = shape1_world['type']
-                    type2 = shape2_world['type']
-                    
-                    if type1 == 'circle' and type2 == 'circle':
+                    if is_circle[i] and is_circle[j]:
                         if collision_utils.check_circle_circle_collision(
-                            shape1_world['world_center_x'], shape1_world['world_center_y'], shape1_world['radius'],
-                            shape2_world['world_center_x'], shape2_world['world_center_y'], shape2_world['radius']
+                            centers[i][0], centers[i][1], radii[i],
+                            centers[j][0], centers[j][1], radii[j]
                         ):
                             collided_this_pair = True
-                    elif type1 == 'square' and type2 == 'square':
-                        if collision_utils.check_square_square_collision(
-                            shape1_world['world_vertices'], shape2_world['world_vertices']
-                        ):
+                    elif not is_circle[i] and not is_circle[j]:
+                        if collision_utils.check_square_square_collision(vertices[i], vertices[j]):
                             collided_this_pair = True
-                    elif type1 == 'circle' and type2 == 'square':
+                    elif is_circle[i]:
                         if collision_utils.check_circle_square_collision(
-                            shape1_world['world_center_x'], shape1_world['world_center_y'], shape1_world['radius'],
-                            shape2_world['world_vertices']
+                            centers[i][0], centers[i][1], radii[i], vertices[j]
                         ):
                             collided_this_pair = True
-                    elif type1 == 'square' and type2 == 'circle':
+                    else:
                          if collision_utils.check_circle_square_collision(
-                            shape2_world['world_center_x'], shape2_world['world_center_y'], shape2_world['radius'],
-                            shape1_world['world_vertices'] # Order matters for the util function
+                            centers[j][0], centers[j][1], radii[j],
+                            vertices[i] # Order matters for the util function
                         ):
                             collided_this_pair = True
-                    # Add more combinations if other shape types are introduced
-
             if collided_this_pair:
-                # Check for projectile vs health entity collision
-                damage1 = self.world.get(entity1, Damage)
-                damage2 = self.world.get(entity2, Damage)
-                health1 = self.world.get(entity1, Health)
-                health2 = self.world.get(entity2, Health)
-                
-                # Apply damage: projectile hits health entity
-                if damage1 and health2:
-                    health2.current_hp -= damage1.amount
-                    print(f"Entity {entity1} hit entity {entity2} for {damage1.amount} damage! Health: {health2.current_hp}/{health2.max_hp}")
-                    self.world.remove_entity(entity1)  # Remove projectile
-                    if health2.current_hp <= 0:
-                        print(f"Entity {entity2} destroyed!")
-                        self.world.remove_entity(entity2)
-                elif damage2 and health1:
-                    health1.current_hp -= damage2.amount
-                    print(f"Entity {entity2} hit entity {entity1} for {damage2.amount} damage! Health: {health1.current_hp}/{health1.max_hp}")
-                    self.world.remove_entity(entity2)  # Remove projectile
-                    if health1.current_hp <= 0:
-                        print(f"Entity {entity1} destroyed!")
-                        self.world.remove_entity(entity1)
-                
-                # Store the pair (order doesn't matter, so store consistently e.g., smaller_id first)
-                pair = tuple(sorted((entity1, entity2)))
-                self.collision_pairs.add(pair)
-                # For now, just print. Later, this could trigger events or component changes.
-                # For example, you might add a "CollidedWith" component to the entities. 
-        end_time = time.perf_counter()
-        print(f"Collision system took {end_time - start_time:.6f} seconds")
+                hits.append((entity1, entity2))
+        return hits
+
+    def process(self, dt):
+        tracer = self.world.tracer
+        self.collision_pairs.clear()
+        
+        # Broad-phase: persistent spatial hash over every active hitbox; culling only affects drawing,
+        # so off-screen and spawning entities still collide
+        buffers = self.world.hitbox_buffers
+        with tracer.span('collision.broad_phase'):
+            self._update_broad_phase(buffers)
+            pairs_a, pairs_b = self.spatial_hash.candidate_pairs(self._pairs_a, self._pairs_b)
+            pairs_a, pairs_b = self._filter_layers(pairs_a, pairs_b)
+        
+        # Narrow-phase on potential pairs, reading the shapes HitboxUpdateSystem laid out
+        hits = []
+        if len(pairs_a) and buffers.size:
+            with tracer.span('collision.narrow_phase'):
+                if self.batched:
+                    hits = self._narrow_phase_batched(buffers, pairs_a, pairs_b)
+                else:
+                    hits = self._narrow_phase_scalar(buffers, pairs_a, pairs_b)
+        # Reactions (damage, despawns) happen in batch when the World dispatches events
+        collision_pairs = self.collision_pairs
+        emit = self.world.events.emit
+        for entity1, entity2 in hits:
+            if entity1 > entity2:
+                entity1, entity2 = entity2, entity1
+            collision_pairs.add((entity1, entity2))
+            emit(CollisionEvent(entity1, entity2))
+
+class DamageSystem:
+    """ Applies projectile damage for the frame's CollisionEvents in one batch.
+
+    Not a per-frame system: it subscribes to the world's event bus and runs when
+    events are dispatched after the other systems.
+    """
+
+    def __init__(self, world):
+        self.world = world
+        world.events.subscribe(CollisionEvent, self.on_collisions)
+
+    def on_collisions(self, events):
+        active = self.world.active_entities  # Culled entities still collide, so they take damage too
+        removed = self.world.commands.removed
+        for event in events:
+            entity1, entity2 = event.entity_a, event.entity_b
+            # An earlier hit in this batch (or a pool return) may have taken one of them out
+            if entity1 not in active or entity2 not in active or entity1 in removed or entity2 in removed:
+                continue
+            damage1 = self.world.get(entity1, Damage)
+            damage2 = self.world.get(entity2, Damage)
+            health1 = self.world.get(entity1, Health)
+            health2 = self.world.get(entity2, Health)
+            if damage1 and health2:
+                self._apply(entity1, damage1, entity2, health2)
+            elif damage2 and health1:
+                self._apply(entity2, damage2, entity1, health1)
+
+    def _apply(self, projectile, damage, target, health):
+        emit = self.world.events.emit
+        commands = self.world.commands
+        health.current_hp -= damage.amount
+        emit(DamageEvent(projectile, target, damage.amount, health.current_hp, health.max_hp))
+        commands.remove(projectile)  # Pooled entities go back to their pool at the flush
+        emit(DespawnEvent(projectile, 'hit'))
+        if health.current_hp <= 0:
+            commands.remove(target)
+            emit(DespawnEvent(target, 'destroyed'))
 
 class CullingSystem:
     def __init__(self, world):
@@ -408,148 +603,184 @@ class CullingSystem:
         screen_w = cfg.SCREEN_WIDTH
         screen_h = cfg.SCREEN_HEIGHT
         buffer = cfg.CAMERA_BUFFER
-        for entity in list(self.world.entities):
+        live = self.world.live_entities
+        for entity in self.world.query_active(Position, IsVisible):
             pos = self.world.get(entity, Position)
-            visible_comp = self.world.get(entity, IsVisible)
-            if pos and visible_comp:
-                visible_comp.visible = (pos.x > -buffer and pos.x < screen_w + buffer and
-                                        pos.y > -buffer and pos.y < screen_h + buffer)
+            visible = (pos.x > -buffer and pos.x < screen_w + buffer and
+                       pos.y > -buffer and pos.y < screen_h + buffer)
+            if visible != (entity in live):
+                self.world.set_visible(entity, visible)
 
 class CleanupSystem:
     def __init__(self, world):
         self.world = world
 
     def process(self, dt):
-        for entity in list(self.world.entities):
-            active = self.world.get(entity, IsActive)
-            visible = self.world.get(entity, IsVisible)
-            if active and not active.active:
-                continue
-            if visible and not visible.visible:
-                continue
-            projectile_tag = self.world.get(entity, Projectile)
+        for entity in self.world.query_live(Projectile, Position):
             pos = self.world.get(entity, Position)
-            flight_plan = self.world.get(entity, FlightPlan)
-            if projectile_tag and pos:
-                if pos.y < 0 or pos.y > cfg.SCREEN_HEIGHT or pos.x < 0 or pos.x > cfg.SCREEN_WIDTH:
-                    self.world.pool_manager.return_to_pool('bullet', entity)
-                    print(f"Returned off-screen projectile {entity} to pool")
-            elif flight_plan and flight_plan.completed and pos:
-                if pos.y > cfg.SCREEN_HEIGHT + 50:
-                    self.world.pool_manager.return_to_pool('mob', entity)
-                    print(f"Returned completed off-screen mob {entity} to pool")
+            if pos.y < 0 or pos.y > cfg.SCREEN_HEIGHT or pos.x < 0 or pos.x > cfg.SCREEN_WIDTH:
+                if self.world.commands.remove(entity):
+                    self.world.events.emit(DespawnEvent(entity, 'offscreen'))
+        for flight_type in (FlightPlan, FormationMember):
+            for entity in self.world.query_active(flight_type, Position):
+                pos = self.world.get(entity, Position)
+                if self.world.get(entity, flight_type).completed:
+                    if pos.y > cfg.SCREEN_HEIGHT + 50:
+                        if self.world.commands.remove(entity):
+                            self.world.events.emit(DespawnEvent(entity, 'completed'))
 
 class FlightSystem:
+    """ Moves every active mob along its precompiled flight path (world.flight_paths).
+
+    Positions are a function of the time since the plan started, so all mobs
+    are evaluated in one batch and written straight into the Position columns.
+    Each solo mob (FlightPlan) is one row of the batch; formation members
+    (FormationMember) that share a formation and delay share a row and only
+    add their offset. The row and slot arrays are only rebuilt when the set of
+    mobs changes. A mob whose path ends on an 'exit' waypoint is despawned
+    there; other finished mobs stay at the end of their path, marked completed.
+    """
+
     def __init__(self, world):
         self.world = world
+        self._solo = frozenset()
+        self._grouped = frozenset()
+        self._entities = []
+        self._states = []  # FlightPlan or FormationMember per entity, for the completed flag
+        self._row_path = np.zeros(0, dtype=np.int64)
+        self._row_start = np.zeros(0)
+        self._row_of = np.zeros(0, dtype=np.int64)
+        self._offset_x = np.zeros(0)
+        self._offset_y = np.zeros(0)
+        self._exits = np.zeros(0, dtype=bool)
+        self._slots = np.zeros(0, dtype=np.int64)
+
+    def _rebuild(self, solo, grouped, paths):
+        get = self.world.get
+        index_of = paths.index_of
+        rows = {}  # FlightPlan, or (Formation, delay): row
+        row_path, row_start = [], []
+        entities, states, row_of, offsets = [], [], [], []
+
+        def add(entity, state, key, plan_id, start_time, offset):
+            row = rows.get(key)
+            if row is None:
+                row = rows[key] = len(row_path)
+                row_path.append(index_of[plan_id])
+                row_start.append(start_time)
+            entities.append(entity)
+            states.append(state)
+            row_of.append(row)
+            offsets.append(offset)
+
+        for entity in solo:
+            plan = get(entity, FlightPlan)
+            if plan.plan_id in index_of:
+                add(entity, plan, plan, plan.plan_id, plan.start_time, (0.0, 0.0))
+        for entity in grouped:
+            member = get(entity, FormationMember)
+            formation = member.formation
+            if formation.plan_id in index_of:
+                delay = formation.delays[member.index]
+                add(entity, member, (formation, delay), formation.plan_id, formation.start_time + delay,
+                    formation.offsets[member.index])
+
+        self._solo = frozenset(solo)
+        self._grouped = frozenset(grouped)
+        self._entities = entities
+        self._states = states
+        self._row_path = np.array(row_path, dtype=np.int64)
+        self._row_start = np.array(row_start, dtype=np.float64)
+        self._row_of = np.array(row_of, dtype=np.int64)
+        offsets = np.array(offsets, dtype=np.float64).reshape(-1, 2)
+        self._offset_x = offsets[:, 0].copy()
+        self._offset_y = offsets[:, 1].copy()
+        self._exits = paths.exit_at_end[self._row_path][self._row_of]
+        store = self.world.store
+        if store is not None:
+            self._slots = np.array([store.slot_of[e] for e in entities], dtype=np.int64)
 
     def process(self, dt):
-        import time
-        current_time = time.time()
-        
-        for entity in list(self.world.entities):  # Use list() to create a copy
-            active = self.world.get(entity, IsActive)
-            visible = self.world.get(entity, IsVisible)
-            if active and not active.active:
-                continue
-            if visible and not visible.visible:
+        paths = self.world.flight_paths
+        if paths is None:
+            return
+        solo = self.world.query_active(FlightPlan, Position)
+        grouped = self.world.query_active(FormationMember, Position)
+        if solo != self._solo or grouped != self._grouped:
+            self._rebuild(solo, grouped, paths)
+        if not self._entities:
+            return
+
+        x, y, finished = paths.evaluate(self._row_path, self.world.time - self._row_start)
+        row_of = self._row_of
+        x = x[row_of] + self._offset_x
+        y = y[row_of] + self._offset_y
+        store = self.world.store
+        if store is not None:
+            n = store.size
+            np.frombuffer(store.column(Position, 'x'), count=n)[self._slots] = x
+            np.frombuffer(store.column(Position, 'y'), count=n)[self._slots] = y
+        else:
+            get = self.world.get
+            for entity, px, py in zip(self._entities, x.tolist(), y.tolist()):
+                pos = get(entity, Position)
+                pos.x = px
+                pos.y = py
+
+        if not finished.any():
+            return
+        for i in np.flatnonzero(finished[row_of]).tolist():
+            state = self._states[i]
+            if state.completed:
                 continue
-            flight_plan = self.world.get(entity, FlightPlan)
-            pos = self.world.get(entity, Position)
-            vel = self.world.get(entity, Velocity)
-            
-            if flight_plan and pos and vel and not flight_plan.completed:
-                # Check if we should move to next waypoint
-                time_since_start = current_time - flight_plan.start_time
-                
-                if flight_plan.current_step < len(flight_plan.waypoints):
-                    current_wp = flight_plan.waypoints[flight_plan.current_step]
-                    
-                    # Check if it's time for this waypoint
-                    if time_since_start >= current_wp.get('Waypoint_Time_Offset', 0):
-                        target_x = current_wp['X']
-                        target_y = current_wp['Y']
-                        speed = current_wp.get('Speed', 100)
-                        
-                        # Calculate direction to target
-                        dx = target_x - pos.x
-                        dy = target_y - pos.y
-                        distance = (dx*dx + dy*dy)**0.5
-                        
-                        if distance > 5:  # Still moving toward waypoint
-                            vel.dx = (dx / distance) * speed
-                            vel.dy = (dy / distance) * speed
-                        else:  # Reached waypoint
-                            pos.x = target_x
-                            pos.y = target_y
-                            vel.dx = 0
-                            vel.dy = 0
-                            
-                            # Execute waypoint action
-                            action = current_wp.get('Action', 'move')
-                            if action == 'exit':
-                                self.world.remove_entity(entity)
-                                continue
-                            elif action == 'fire':
-                                # TODO: Implement mob firing
-                                pass
-                            
-                            # Move to next waypoint
-                            flight_plan.current_step += 1
-                            
-                            if flight_plan.current_step >= len(flight_plan.waypoints):
-                                flight_plan.completed = True
-                                vel.dx = 0
-                                vel.dy = 0
-                                # Check if off-screen to return to pool
-                                if pos.y > cfg.SCREEN_HEIGHT + 50:
-                                    self.world.pool_manager.return_to_pool('mob', entity)
-                                    print(f"Returned completed mob {entity} to pool")
+            state.completed = True
+            if self._exits[i]:
+                entity = self._entities[i]
+                if self.world.commands.remove(entity):
+                    self.world.events.emit(DespawnEvent(entity, 'exit'))
 
 class LevelSystem:
+    """ Plays each LevelManager's timeline.
+
+    Due events run the handler registered for their Event type, if any. Every
+    event, handled or not (Start, messages, backgrounds, cutscenes, ...), is
+    also published as a LevelEvent when it starts and when its Event_Duration
+    ends, so other systems can react without LevelSystem knowing about them.
+    """
+
     def __init__(self, world):
         self.world = world
+        self.handlers = {'spawn_mob': self.spawn_mob, 'spawn_formation': self.spawn_formation}  # Event type: callable taking (event row, LevelManager)
+
+    def register_handler(self, event_type, handler):
+        self.handlers[event_type] = handler
 
     def process(self, dt):
-        import time
-        current_time = time.time()
-        
-        for entity in list(self.world.entities):  # Use list() to create a copy
+        emit = self.world.events.emit
+        for entity in self.world.query(LevelManager):
             level_mgr = self.world.get(entity, LevelManager)
-            if level_mgr:
-                level_mgr.game_time += dt
-                
-                # Check for events to spawn
-                for event in level_mgr.events:
-                    event_key = f"{event['Level']}_{event['Event_Start']}"
-                    if (level_mgr.game_time >= event['Event_Start'] and 
-                        event_key not in level_mgr.spawned_events):
-                        
-                        if event['Event'] == 'spawn_mob':
-                            self.spawn_mob(event)
-                            level_mgr.spawned_events.add(event_key)
-                            print(f"Spawned mob at t={level_mgr.game_time:.1f}s")
-
-    def spawn_mob(self, event):
-        from .hitbox_loader import load_hitbox_from_json
-        import pygame
-        
-        # Get mob data
+            level_mgr.game_time += dt
+            started, ended = level_mgr.timeline.advance(level_mgr.game_time)
+            for event in started:
+                handler = self.handlers.get(event['Event'])
+                if handler is not None:
+                    handler(event, level_mgr)
+                emit(LevelEvent(level_mgr.level_id, event, 'start'))
+            for event in ended:
+                emit(LevelEvent(level_mgr.level_id, event, 'end'))
+
+    def spawn_mob(self, event, level_mgr):
+        # Get mob data, preloaded with the level (no disk access during frames)
         mob_id = event['Mob_ID']
         flight_plan_id = event['Flight_Plan_ID']
-        
-        # Query mob data (could be cached)
-        import sqlite3
-        conn = sqlite3.connect('GameDB.db')
-        conn.row_factory = sqlite3.Row
-        cursor = conn.cursor()
-        cursor.execute('SELECT * FROM Mobs WHERE Mob_ID = ?', (mob_id,))
-        mob_data = cursor.fetchone()
-        conn.close()
+        mob_data = level_mgr.mob_cache.get(mob_id)
         
         if not mob_data:
             print(f"Mob {mob_id} not found!")
             return
+        if flight_plan_id not in self.world.flight_paths:
+            print(f"Flight plan {flight_plan_id} has no waypoints, skipping spawn")
+            return
         
         # Create mob entity from pool
         mob_eid = self.world.pool_manager.get('mob')
@@ -557,43 +788,73 @@ class LevelSystem:
             print(f"Mob pool empty, skipping spawn")
             return
         
-        # Configure position from first waypoint
-        if flight_plan_id in self.world.flight_plans:
-            waypoints = self.world.flight_plans[flight_plan_id]
-            if waypoints:
-                first_wp = waypoints[0]
-                spawn_x = first_wp['X']
-                spawn_y = first_wp['Y']
-            else:
-                spawn_x, spawn_y = 400, -50
-        else:
-            spawn_x, spawn_y = 400, -50
+        spawn_x, spawn_y = self._path_start(flight_plan_id)
+        self._prepare_mob(mob_eid, mob_data, spawn_x, spawn_y)
         
+        # Add flight plan
+        flight_plan = FlightPlan(flight_plan_id, self.world.flight_plans[flight_plan_id], 0, self.world.time)
+        self.world.add_component(mob_eid, flight_plan)
+        
+        print(f"Spawned mob {mob_id} with flight plan {flight_plan_id} at ({spawn_x}, {spawn_y})")
+
+    def spawn_formation(self, event, level_mgr):
+        """ Spawns one mob per row of the event's formation, all flying one shared plan. """
+        mob_id = event['Mob_ID']
+        flight_plan_id = event['Flight_Plan_ID']
+        formation_id = event['Formation_ID']
+        mob_data = level_mgr.mob_cache.get(mob_id)
+        slots = level_mgr.formations.get(formation_id)
+        if not mob_data or not slots:
+            print(f"Formation {formation_id} of mob {mob_id} not found!")
+            return
+        if flight_plan_id not in self.world.flight_paths:
+            print(f"Flight plan {flight_plan_id} has no waypoints, skipping formation {formation_id}")
+            return
+
+        mob_eids = self.world.pool_manager.get_many('mob', len(slots))
+        if len(mob_eids) < len(slots):
+            print(f"Mob pool short, formation {formation_id} spawns {len(mob_eids)} of {len(slots)} mobs")
+        formation = Formation(formation_id, flight_plan_id, self.world.time,
+                              [(slot['Offset_X'], slot['Offset_Y']) for slot in slots],
+                              [slot['Delay'] or 0.0 for slot in slots])
+        start_x, start_y = self._path_start(flight_plan_id)
+        for index, mob_eid in enumerate(mob_eids):
+            offset_x, offset_y = formation.offsets[index]
+            self._prepare_mob(mob_eid, mob_data, start_x + offset_x, start_y + offset_y)
+            self.world.add_component(mob_eid, FormationMember(formation, index))
+        print(f"Spawned formation {formation_id} of {len(mob_eids)} mob {mob_id} with flight plan {flight_plan_id}")
+
+    def _path_start(self, flight_plan_id):
+        """ Where the compiled path starts, so mobs don't jump on their first frame. """
+        return self.world.flight_paths.paths[flight_plan_id].start
+
+    def _prepare_mob(self, mob_eid, mob_data, x, y):
+        """ Places a mob fresh from the pool and applies its Mobs row (sprite, HP). """
         pos = self.world.get(mob_eid, Position)
-        pos.x = spawn_x
-        pos.y = spawn_y
+        pos.x = x
+        pos.y = y
         
         vel = self.world.get(mob_eid, Velocity)
         vel.dx = 0
         vel.dy = 0
         
-        # AtlasReference already set in pool create
+        # AtlasReference is created by the pool; point it at this mob's sprite
+        if mob_data['Mob_Sprite_Path'] in self.world.atlas:
+            self.world.get(mob_eid, AtlasReference).atlas_key = mob_data['Mob_Sprite_Path']
         
         # Health from cache
         self.world.add_component(mob_eid, Health(mob_data['Mob_HP']))
         
-        # Add flight plan
-        import time
-        flight_plan = FlightPlan(flight_plan_id, self.world.flight_plans[flight_plan_id], 0, time.time())
-        self.world.add_component(mob_eid, flight_plan)
-        
-        # Add hitbox (assuming same for all mobs for now)
-        # Removed - now in pool create
-        
-        # Activate
-        active = self.world.get(mob_eid, IsActive)
-        active.active = True
-        visible = self.world.get(mob_eid, IsVisible)
-        visible.visible = True  # Assuming IsVisible has 'visible' attr
+        # Look the hitbox up again so one refreshed on disk (F5) reaches new spawns; the
+        # mob just became active, so HitboxUpdateSystem rebuilds its shapes this tick
+        compiled = self.world.assets.hitbox(cfg.MOB_HITBOX_PATH)
+        hitbox = self.world.get(mob_eid, Hitbox)
+        if hitbox is None:
+            if compiled.count:
+                self.world.add_component(mob_eid, Hitbox(compiled.local_shapes, compiled))
+        elif hitbox.compiled is not compiled:
+            hitbox.local_shapes = compiled.local_shapes
+            hitbox.compiled = compiled
         
-        print(f"Spawned mob {mob_id} with flight plan {flight_plan_id} at ({spawn_x}, {spawn_y})") 
\ No newline at end of file
+        # Pool get already activated it; make it visible straight away
+        self.world.set_visible(mob_eid, True)
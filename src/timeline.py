@@ -0,0 +1,44 @@
+import heapq
+
+
+class Timeline:
+    """ A level script released in Event_Start order by a cursor.
+
+    advance(now) only looks at events that became due since the previous call
+    and at the earliest pending end time, so the per-frame cost depends on what
+    happens this frame rather than on the length of the script. Events with an
+    Event_Duration stay active until start + duration and are then reported as
+    ended.
+    """
+
+    def __init__(self, events):
+        self.events = sorted(events, key=lambda event: event['Event_Start'])  # Stable for equal starts
+        self.cursor = 0
+        self._ending = []  # Heap of (end time, index, event)
+
+    def __len__(self):
+        return len(self.events)
+
+    @property
+    def finished(self):
+        return self.cursor >= len(self.events) and not self._ending
+
+    def active(self):
+        """ Events that started and whose duration hasn't run out, in end-time order. """
+        return [event for _, _, event in sorted(self._ending)]
+
+    def advance(self, now):
+        """ Returns (started, ended): events due at or before `now` not reported yet. """
+        events = self.events
+        started = []
+        while self.cursor < len(events) and events[self.cursor]['Event_Start'] <= now:
+            event = events[self.cursor]
+            started.append(event)
+            duration = event.get('Event_Duration')
+            if duration:
+                heapq.heappush(self._ending, (event['Event_Start'] + duration, self.cursor, event))
+            self.cursor += 1
+        ended = []
+        while self._ending and self._ending[0][0] <= now:
+            ended.append(heapq.heappop(self._ending)[2])
+        return started, ended
@@ -0,0 +1,108 @@
+import json
+import os
+import time
+from collections import deque
+
+
+class _NullSpan:
+    """ Shared no-op context returned by span() while tracing is off. """
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+
+NULL_SPAN = _NullSpan()
+
+
+class _Span:
+    __slots__ = ('tracer', 'name', 'start')
+
+    def __init__(self, tracer, name):
+        self.tracer = tracer
+        self.name = name
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.tracer.record(self.name, self.start, time.perf_counter())
+        return False
+
+
+class Tracer:
+    """ Records timed spans per frame into a ring buffer and exports Chrome trace JSON.
+
+    World.update records one span per system plus a 'frame' span; systems can add
+    nested spans with `with world.tracer.span('name'):`. Only the newest `capacity`
+    spans are kept. When spike_ms is set, any frame slower than that has a copy of
+    the buffer set aside (at most max_spike_exports times); write_spikes() saves
+    them to output_dir outside the simulation tick, so stutters can be opened in
+    chrome://tracing or ui.perfetto.dev without the export causing the next one.
+    """
+
+    def __init__(self, enabled=False, capacity=20000, spike_ms=None, output_dir='traces', max_spike_exports=10):
+        self.enabled = enabled
+        self.events = deque(maxlen=capacity)  # (name, start, end, frame)
+        self.spike_ms = spike_ms
+        self.output_dir = output_dir
+        self.max_spike_exports = max_spike_exports
+        self.spike_exports = 0
+        self.pending_spikes = []  # (frame, duration ms, copy of the buffer) awaiting write_spikes()
+        self.frame = 0
+
+    def span(self, name):
+        if not self.enabled:
+            return NULL_SPAN
+        return _Span(self, name)
+
+    def record(self, name, start, end):
+        self.events.append((name, start, end, self.frame))
+
+    def end_frame(self, start, end):
+        """ Records the frame span and keeps a copy of the buffer if the frame was a spike. """
+        self.record('frame', start, end)
+        duration_ms = (end - start) * 1000.0
+        if self.spike_ms is not None and duration_ms > self.spike_ms and self.spike_exports < self.max_spike_exports:
+            self.spike_exports += 1
+            self.pending_spikes.append((self.frame, duration_ms, list(self.events)))
+        self.frame += 1
+
+    def write_spikes(self):
+        """ Exports the spike captures taken since the last call. Returns the written paths. """
+        if not self.pending_spikes:
+            return []
+        pending, self.pending_spikes = self.pending_spikes, []
+        paths = []
+        for frame, duration_ms, events in pending:
+            path = self.export(os.path.join(self.output_dir, f"spike_frame_{frame}.json"), events)
+            print(f"Frame {frame} took {duration_ms:.1f} ms; trace written to {path}")
+            paths.append(path)
+        return paths
+
+    def to_chrome_trace(self, events=None):
+        """ Returns spans (the buffer by default) as a Chrome trace-event dict (complete 'X' events in microseconds). """
+        if events is None:
+            events = self.events
+        events = [{
+            'name': name,
+            'ph': 'X',
+            'ts': start * 1e6,
+            'dur': (end - start) * 1e6,
+            'pid': 1,
+            'tid': 1,
+            'args': {'frame': frame},
+        } for name, start, end, frame in events]
+        return {'traceEvents': events, 'displayTimeUnit': 'ms'}
+
+    def export(self, path=None, events=None):
+        """ Writes spans (the buffer by default) as Chrome trace JSON and returns the path. """
+        if path is None:
+            path = os.path.join(self.output_dir, f"trace_frame_{self.frame}.json")
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        with open(path, 'w') as f:
+            json.dump(self.to_chrome_trace(events), f)
+        return path
@@ -1,33 +1,161 @@
-from .components import IsActive  # For pooling
+import time
+from .components import IsActive, IsVisible  # For pooling
+from .storage import ColumnStore, PositionHistory
+from .hitbox_batch import HitboxBuffers
+from .assets import AssetRegistry
+from .tracing import Tracer
+from .events import EventBus
+from .commands import CommandBuffer
 
 class World:
-    def __init__(self):
+    def __init__(self, columnar=False, tracer=None):
         self.entities = set()
         self.components = {}
-        self.systems = []
+        self.entity_components = {}  # eid: set of component types it holds
+        # Optional struct-of-arrays backend for the hot numeric components
+        self.store = ColumnStore() if columnar else None
+        # Pre-tick positions for interpolated rendering (columnar storage only)
+        self.position_history = PositionHistory(self.store) if columnar else None
+        self._queries = {}  # signature tuple: set of matching eids
+        self._queries_by_type = {}  # type: list of signatures that include it
+        # Dense liveness indexes. An entity without IsActive/IsVisible counts as active/visible.
+        self.active_entities = set()
+        self.live_entities = set()  # Active and visible
+        self.systems = []  # Simulation systems, run by update() once per tick
+        self.render_systems = []  # Run by render() once per displayed frame
         self.next_entity_id = 0
+        self.time = 0.0  # Game clock in seconds, advanced by update(); use instead of wall time
         self.pool_manager = PoolManager(self)
         self.atlas = None  # Set in main
+        self.assets = AssetRegistry()  # Shared, memoized sprites and hitboxes
+        self.hitbox_buffers = HitboxBuffers()  # Filled by HitboxUpdateSystem
         self.flight_plans = None
+        self.flight_paths = None  # FlightPathTable compiled from flight_plans
+        self.db = None  # GameDB the world was loaded from (frozen while running)
+        self.tracer = tracer or Tracer()  # Disabled unless configured
+        self.events = EventBus()  # Drained after the systems each update
+        self.commands = CommandBuffer(self)  # Structural changes, flushed after the events
         
-    def add_entity(self):
+    def reserve_entity(self):
+        """ Hands out an id without creating the entity (see CommandBuffer.create). """
         entity = self.next_entity_id
         self.next_entity_id += 1
+        return entity
+
+    def add_entity(self, entity=None):
+        if entity is None:
+            entity = self.reserve_entity()
         self.entities.add(entity)
+        self.entity_components[entity] = set()
+        self.active_entities.add(entity)
+        self.live_entities.add(entity)
         return entity
         
     def remove_entity(self, entity):
         if entity in self.entities:
             self.entities.remove(entity)
-            for component_type in list(self.components.keys()):
-                if entity in self.components[component_type]:
-                    del self.components[component_type][entity]
+            self.active_entities.discard(entity)
+            self.live_entities.discard(entity)
+            for component_type in self.entity_components.pop(entity):
+                del self.components[component_type][entity]
+                for signature in self._queries_by_type.get(component_type, ()):
+                    self._queries[signature].discard(entity)
+            if self.store is not None:
+                self.store.release(entity)
+            self.pool_manager.forget(entity)
     
     def add_component(self, entity, component):
         component_type = type(component)
+        if self.store is not None:
+            # Columnar components are stored as views over the store's columns
+            component_type, component = self.store.attach(entity, component)
+            self.store.set_live(entity, entity in self.live_entities)
         if component_type not in self.components:
             self.components[component_type] = {}
         self.components[component_type][entity] = component
+        held = self.entity_components[entity]
+        if component_type not in held:
+            held.add(component_type)
+            for signature in self._queries_by_type.get(component_type, ()):
+                if held.issuperset(signature):
+                    self._queries[signature].add(entity)
+        if component_type is IsActive or component_type is IsVisible:
+            self._update_liveness(entity)
+
+    def remove_component(self, entity, component_type):
+        """ Removes a component from an entity, returning it (or None if absent). """
+        component = self.components.get(component_type, {}).pop(entity, None)
+        if component is None:
+            return None
+        self.entity_components[entity].discard(component_type)
+        for signature in self._queries_by_type.get(component_type, ()):
+            self._queries[signature].discard(entity)
+        if self.store is not None:
+            self.store.detach(entity, component_type)
+        if component_type is IsActive or component_type is IsVisible:
+            self._update_liveness(entity)
+        return component
+
+    def _update_liveness(self, entity):
+        active = self.components.get(IsActive, {}).get(entity)
+        visible = self.components.get(IsVisible, {}).get(entity)
+        if active is None or active.active:
+            self.active_entities.add(entity)
+            live = visible is None or visible.visible
+        else:
+            self.active_entities.discard(entity)
+            live = False
+        if live:
+            self.live_entities.add(entity)
+        else:
+            self.live_entities.discard(entity)
+        if self.store is not None:
+            self.store.set_live(entity, live)
+
+    def set_active(self, entity, active):
+        """ Sets IsActive.active and updates the liveness indexes in O(1).
+
+        Flags must be flipped through here (or set_visible) rather than on the
+        component directly, otherwise systems will not see the change.
+        """
+        active_comp = self.get(entity, IsActive)
+        if active_comp:
+            active_comp.active = active
+            self._update_liveness(entity)
+
+    def set_visible(self, entity, visible):
+        visible_comp = self.get(entity, IsVisible)
+        if visible_comp:
+            visible_comp.visible = visible
+            self._update_liveness(entity)
+
+    def query(self, *component_types):
+        """ Returns the cached set of entities holding all of component_types.
+
+        The set is kept up to date by add_component, remove_component and
+        remove_entity, so it must be treated as read-only and copied before
+        iterating if the loop body adds or removes components or entities.
+        """
+        matches = self._queries.get(component_types)
+        if matches is None:
+            candidates = min((self.components.get(t, {}) for t in component_types), key=len)
+            matches = {e for e in candidates if self.entity_components[e].issuperset(component_types)}
+            self._queries[component_types] = matches
+            for component_type in set(component_types):
+                self._queries_by_type.setdefault(component_type, []).append(component_types)
+        return matches
+
+    def query_active(self, *component_types):
+        """ Like query(), restricted to active entities. Returns a new set. """
+        return self.query(*component_types) & self.active_entities
+
+    def query_live(self, *component_types):
+        """ Like query(), restricted to active and visible entities. Returns a new set.
+
+        The intersection walks the smaller of the two sets, so the cost follows
+        the number of live entities rather than pool capacity.
+        """
+        return self.query(*component_types) & self.live_entities
         
     def get(self, entity, component_type):
         if component_type in self.components and entity in self.components[component_type]:
@@ -36,40 +164,160 @@ class World:
         
     def add_system(self, system):
         self.systems.append(system)
+
+    def add_render_system(self, system):
+        """ Registers a system whose draw(alpha) is called by render() instead of update(). """
+        self.render_systems.append(system)
         
     def update(self, dt):
+        """ Advances the simulation by one tick of dt seconds. """
+        self.time += dt
+        if self.position_history is not None:
+            self.position_history.capture()
+        tracer = self.tracer
+        if not tracer.enabled:
+            for system in self.systems:
+                system.process(dt)
+            self.events.dispatch()
+            self.commands.flush()
+            return
+        clock = time.perf_counter
+        frame_start = clock()
         for system in self.systems:
-            system.process(dt) 
+            start = clock()
+            system.process(dt)
+            tracer.record(type(system).__name__, start, clock())
+        with tracer.span('events'):
+            self.events.dispatch()
+        with tracer.span('commands'):
+            self.commands.flush()
+        tracer.end_frame(frame_start, clock())
+
+    def render(self, alpha=1.0):
+        """ Draws the current state; alpha (0..1) is how far the display is between the last two ticks. """
+        tracer = self.tracer
+        for system in self.render_systems:
+            if tracer.enabled:
+                with tracer.span(type(system).__name__):
+                    system.draw(alpha)
+            else:
+                system.draw(alpha)
+
+class PoolStats:
+    """ Occupancy counters for one pool, used to size pools from real sessions. """
+
+    def __init__(self):
+        self.capacity = 0  # Entities the pool has created
+        self.in_use = 0
+        self.high_water = 0  # Most entities handed out at once
+        self.acquired = 0
+        self.grown = 0  # Times the pool grew by a chunk
+        self.exhausted = 0  # Requests that couldn't be served, even after growing
+
+    def as_dict(self):
+        return dict(vars(self))
+
 
 class PoolManager:
+    """ Fixed-type entity pools with O(1) acquire and release.
+
+    Free entities sit on a stack per pool. When a pool runs dry it grows by its
+    grow_by chunk (up to max_size, if set); requests it still can't serve are
+    counted as exhaustion in its PoolStats.
+    """
+
     def __init__(self, world):
         self.world = world
-        self.pools = {}  # type: list of eids
+        self.pools = {}  # type: stack of free eids
+        self.create_callbacks = {}  # type: callback function
         self.reset_callbacks = {}  # type: callback function
+        self.grow_by = {}  # type: entities created when the pool runs dry (0 = fixed size)
+        self.max_size = {}  # type: capacity limit, or None
+        self.stats = {}  # type: PoolStats
+        self.owner = {}  # eid: pool type, for every entity a pool created
+        self.in_use = set()  # Pooled eids currently handed out
 
-    def register_pool(self, pool_type, size, create_callback, reset_callback):
+    def register_pool(self, pool_type, size, create_callback, reset_callback, grow_by=0, max_size=None):
         self.pools[pool_type] = []
+        self.create_callbacks[pool_type] = create_callback
         self.reset_callbacks[pool_type] = reset_callback
-        for _ in range(size):
+        self.grow_by[pool_type] = grow_by
+        self.max_size[pool_type] = max_size
+        self.stats[pool_type] = PoolStats()
+        self._create(pool_type, size)
+
+    def _create(self, pool_type, count):
+        stats = self.stats[pool_type]
+        if self.max_size[pool_type] is not None:
+            count = min(count, self.max_size[pool_type] - stats.capacity)
+        if count <= 0:
+            return 0
+        free = self.pools[pool_type]
+        create_callback = self.create_callbacks[pool_type]
+        for _ in range(count):
             eid = self.world.add_entity()
             create_callback(eid)
             self.world.add_component(eid, IsActive())  # Inactive by default
-            self.pools[pool_type].append(eid)
+            free.append(eid)
+            self.owner[eid] = pool_type
+        stats.capacity += count
+        return count
 
     def get(self, pool_type):
-        if self.pools[pool_type]:
-            eid = self.pools[pool_type].pop(0)
-            active_comp = self.world.get(eid, IsActive)
-            if active_comp:
-                active_comp.active = True  # Activate
-            self.reset_callbacks[pool_type](eid)  # Reset state
-            return eid
-        return None  # Pool empty
+        eids = self.get_many(pool_type, 1)
+        return eids[0] if eids else None  # None: pool empty and can't grow
+
+    def get_many(self, pool_type, count):
+        """ Hands out up to count entities (fewer only if the pool is exhausted). """
+        free = self.pools[pool_type]
+        stats = self.stats[pool_type]
+        chunk = self.grow_by[pool_type]
+        while len(free) < count and chunk:
+            if not self._create(pool_type, max(chunk, count - len(free))):
+                break
+            stats.grown += 1
+        if len(free) < count:
+            stats.exhausted += 1
+            count = len(free)
+        eids = []
+        reset = self.reset_callbacks[pool_type]
+        for _ in range(count):
+            eid = free.pop()
+            self.in_use.add(eid)
+            self.world.set_active(eid, True)  # Activate
+            reset(eid)  # Reset state
+            eids.append(eid)
+        stats.acquired += count
+        stats.in_use += count
+        if stats.in_use > stats.high_water:
+            stats.high_water = stats.in_use
+        return eids
+
+    def pool_of(self, eid):
+        """ Returns the type of the pool that created eid, or None if it isn't pooled. """
+        return self.owner.get(eid)
+
+    def forget(self, eid):
+        """ Drops a destroyed entity from pool bookkeeping. """
+        pool_type = self.owner.pop(eid, None)
+        if pool_type is not None:
+            stats = self.stats[pool_type]
+            stats.capacity -= 1
+            if eid in self.in_use:
+                self.in_use.discard(eid)
+                stats.in_use -= 1
+            else:
+                self.pools[pool_type].remove(eid)
 
     def return_to_pool(self, pool_type, eid):
-        if eid in self.world.entities:
-            active_comp = self.world.get(eid, IsActive)
-            if active_comp:
-                active_comp.active = False  # Deactivate
+        # Only entities currently handed out go back, so a double return can't duplicate an eid
+        if eid in self.in_use and eid in self.world.entities:
+            self.in_use.discard(eid)
+            self.stats[pool_type].in_use -= 1
+            self.world.set_active(eid, False)  # Deactivate
             self.reset_callbacks[pool_type](eid)  # Reset
-            self.pools[pool_type].append(eid) 
\ No newline at end of file
+            self.pools[pool_type].append(eid)
+
+    def report(self):
+        """ Returns {pool type: stats dict} for logging or sizing pools. """
+        return {pool_type: stats.as_dict() for pool_type, stats in self.stats.items()}